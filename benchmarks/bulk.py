@@ -0,0 +1,92 @@
+import gc
+import time
+from typing import Callable
+
+import numpy as np
+
+from snakia.core.ecs import (
+    ArchetypeStorage,
+    ColumnarComponent,
+    DictStorage,
+    FastComponent,
+    Storage,
+    System,
+)
+
+N = 50_000
+
+
+class Position(ColumnarComponent):
+    x: float = 0.0
+    y: float = 0.0
+
+
+class Health(FastComponent):
+    value: int = 100
+
+
+def per_entity(action: Callable[[], object]) -> float:
+    # As in timeit, the garbage collector is paused while measuring,
+    # so the timings do not depend on the objects built by earlier runs.
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        action()
+        return (time.perf_counter() - start) / N * 1e9
+    finally:
+        gc.enable()
+
+
+def bench(name: str, storage: Callable[[], Storage]) -> None:
+    xs = np.arange(N, dtype=np.float64)
+    # The loop and the batch share components built beforehand,
+    # so they only measure the work of the system.
+    rows: list[tuple[Position, Health]] = []
+    build = per_entity(
+        lambda: rows.extend((Position(x=x, y=x), Health()) for x in xs.tolist())
+    )
+
+    system = System(storage())
+    create_loop = per_entity(lambda: [system.create_entity(*row) for row in rows])
+    entities = list(system.storage.entities())
+    delete_loop = per_entity(
+        lambda: [system.delete_entity(e, immediate=True) for e in entities]
+    )
+
+    system = System(storage())
+    entities = []
+    create_batch = per_entity(lambda: entities.extend(system.create_entities(rows)))
+    delete_batch = per_entity(lambda: system.delete_entities(entities))
+
+    system = System(storage())
+    create_columns = per_entity(
+        lambda: system.create_entities_from_columns(
+            {Position: {"x": xs, "y": xs}, Health: [Health() for _ in range(N)]},
+            N,
+        )
+    )
+
+    system = System(storage())
+    system.add_prefab("unit", Position(), Health())
+    create_prefab = per_entity(
+        lambda: system.instantiate("unit", N, {Position: {"x": xs, "y": xs}})
+    )
+    print(
+        f"{name:<10} build: {build:6.0f} ns"
+        f" | create loop: {create_loop:6.0f} ns"
+        f"  batch: {create_batch:6.0f} ns"
+        f"  columns: {create_columns:6.0f} ns"
+        f"  prefab: {create_prefab:6.0f} ns"
+        f" | delete loop: {delete_loop:6.0f} ns"
+        f"  batch: {delete_batch:6.0f} ns"
+    )
+
+
+def main() -> None:
+    bench("dict", DictStorage)
+    bench("archetype", ArchetypeStorage)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+from snakia.core.ecs import Component, FastComponent
+
+N = 100_000
+
+
+class HealthComponent(Component):
+    max_value: int = 100
+    value: int = 100
+
+
+class FastHealthComponent(FastComponent):
+    max_value: int = 100
+    value: int = 100
+
+
+def measure_memory(factory: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    items = [factory() for _ in range(N)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size / N
+
+
+def bench(name: str, cls: type[Any]) -> None:
+    create = timeit.timeit(lambda: cls(value=50), number=N)
+    instance = cls(value=50)
+
+    def mutate() -> None:
+        instance.value -= 1
+
+    write = timeit.timeit(mutate, number=N)
+    memory = measure_memory(lambda: cls(value=50))
+    print(
+        f"{name:<20} create: {create / N * 1e9:7.0f} ns"
+        f"  mutate: {write / N * 1e9:7.0f} ns"
+        f"  memory: {memory:6.0f} B"
+    )
+
+
+def main() -> None:
+    bench("Component", HealthComponent)
+    bench("FastComponent", FastHealthComponent)
+
+
+if __name__ == "__main__":
+    main()
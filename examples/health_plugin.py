@@ -16,11 +16,15 @@ class HealthComponent(Component):
 
 
 class DamageComponent(Component):
+    __sparse__ = True
+
     damage: int = Field(ge=0)
     ticks: int = Field(default=1, ge=0)
 
 
 class HealComponent(Component):
+    __sparse__ = True
+
     heal: int = Field(ge=0)
     ticks: int = Field(default=1, ge=0)
 
@@ -37,16 +41,16 @@ class HealthProcessor(PluginProcessor):
             health.value += heal.heal
             heal.ticks -= 1
             if heal.ticks <= 0:
-                system.remove_component(entity, HealComponent)
+                system.commands.remove_component(entity, HealComponent)
         for entity, (damage, health) in system.get_components(
             DamageComponent, HealthComponent
         ):
             health.value -= damage.damage
             damage.ticks -= 1
             if damage.ticks <= 0:
-                system.remove_component(entity, DamageComponent)
+                system.commands.remove_component(entity, DamageComponent)
             if health.value <= 0:
-                system.remove_component(entity, HealthComponent)
+                system.commands.remove_component(entity, HealthComponent)
                 self.plugin.dispatcher.publish(DeathEvent(entity=entity))
 
 
@@ -1,5 +1,81 @@
+from .columnar import ColumnarComponent
+from .command_buffer import CommandBuffer
 from .component import Component
+from .criteria import (
+    RunCriterion,
+    all_of,
+    any_of,
+    every,
+    has_entities,
+    negate,
+    resource_changed,
+)
+from .delta import Delta, DeltaRecorder
+from .entity_pool import EntityPool
+from .fast_component import FastComponent
+from .hierarchy import Hierarchy
+from .observer import ComponentObserver, EntityObserver
+from .plan import ExecutionPlan
+from .prefab import Prefab
 from .processor import Processor
+from .profiler import ProcessorStats, Profiler
+from .query import Query
+from .resources import Resources
+from .scheduler import Scheduler, TickStats
+from .shard import ShardedSystem
+from .spatial import SpatialIndex
+from .storage import (
+    ArchetypeStorage,
+    DictStorage,
+    MappedStorage,
+    Storage,
+    TableStorage,
+)
 from .system import System
+from .tag import Tag
+from .terms import Added, Changed, Optional, Or, Removed, Term, Without
 
-__all__ = ["Processor", "Component", "System"]
+__all__ = [
+    "Processor",
+    "RunCriterion",
+    "every",
+    "has_entities",
+    "all_of",
+    "any_of",
+    "negate",
+    "resource_changed",
+    "Resources",
+    "ExecutionPlan",
+    "Component",
+    "ColumnarComponent",
+    "FastComponent",
+    "Tag",
+    "System",
+    "ShardedSystem",
+    "Query",
+    "Term",
+    "Added",
+    "Changed",
+    "Removed",
+    "Without",
+    "Optional",
+    "Or",
+    "CommandBuffer",
+    "EntityPool",
+    "ComponentObserver",
+    "EntityObserver",
+    "Delta",
+    "DeltaRecorder",
+    "SpatialIndex",
+    "Hierarchy",
+    "Prefab",
+    "Scheduler",
+    "Profiler",
+    "ProcessorStats",
+    "TickStats",
+    "Storage",
+    "DictStorage",
+    "ArchetypeStorage",
+    "MappedStorage",
+    "TableStorage",
+]
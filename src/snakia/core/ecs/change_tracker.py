@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Any
+from weakref import WeakSet
+
+from .component import Component
+
+if TYPE_CHECKING:
+    from .query import Query
+
+
+class ChangeLog:
+    """
+    Records the change ticks of the components of one type.
+    """
+
+    __slots__ = ("__tracker", "added", "changed", "removed")
+
+    def __init__(self, tracker: ChangeTracker) -> None:
+        self.__tracker = tracker
+        self.added: dict[int, int] = {}
+        self.changed: dict[int, int] = {}
+        self.removed: dict[int, tuple[int, Component]] = {}
+
+    def on_component_added(self, entity: int, _: Component, /) -> None:
+        tick = self.__tracker.tick
+        self.added[entity] = tick
+        self.changed[entity] = tick
+
+    def on_component_changed(self, entity: int, _: Component, /) -> None:
+        self.changed[entity] = self.__tracker.tick
+
+    def on_component_removed(self, entity: int, component: Component, /) -> None:
+        self.added.pop(entity, None)
+        self.changed.pop(entity, None)
+        self.removed[entity] = (self.__tracker.tick, component)
+
+    def prune(self, tick: int) -> None:
+        """Drops the records of the given tick and older ones."""
+        self.added = {e: t for e, t in self.added.items() if t > tick}
+        self.changed = {e: t for e, t in self.changed.items() if t > tick}
+        self.removed = {e: r for e, r in self.removed.items() if r[0] > tick}
+
+
+class ChangeTracker:
+    """
+    Keeps the change logs read by the queries with change terms.
+
+    Every time such a query runs it advances the tick,
+    so it sees each change exactly once.
+
+    Records are kept until every reader has seen them, but no longer than
+    `retention` prunes: a query that is not run for that many updates only
+    sees the changes of the last ones. Dropped queries stop being readers.
+    """
+
+    def __init__(self, retention: int = 64) -> None:
+        self.tick = 1
+        self.__logs: dict[type[Component], ChangeLog] = {}
+        self.__readers: WeakSet[Query[Any]] = WeakSet()
+        self.__prunes: deque[int] = deque(maxlen=retention)
+
+    def get_log(self, component_type: type[Component]) -> ChangeLog | None:
+        """Returns the change log of the given component type, if tracked."""
+        return self.__logs.get(component_type)
+
+    def create_log(self, component_type: type[Component]) -> ChangeLog:
+        """Starts tracking the changes of the given component type."""
+        log = self.__logs[component_type] = ChangeLog(self)
+        return log
+
+    def add_reader(self, query: Query[Any]) -> None:
+        """Registers a query whose last run limits pruning."""
+        self.__readers.add(query)
+
+    def advance(self) -> int:
+        """Returns the current tick and starts a new one."""
+        tick = self.tick
+        self.tick += 1
+        return tick
+
+    def clear(self) -> None:
+        """Drops every record."""
+        for log in self.__logs.values():
+            log.prune(self.tick)
+
+    def prune(self) -> None:
+        """Drops the records that every reader has already seen,
+        and the ones older than the retention window."""
+        prunes = self.__prunes
+        prunes.append(self.advance())
+        if not self.__logs:
+            return
+        tick = min((query.last_run for query in self.__readers), default=self.tick)
+        if len(prunes) == prunes.maxlen:
+            tick = max(tick, prunes[0])
+        for log in self.__logs.values():
+            log.prune(tick)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from typing import Any, ClassVar, TypeVar
+
+from .component import Component
+
+T = TypeVar("T", bound="ColumnarComponent")
+
+_DTYPES: dict[Any, str] = {bool: "bool", int: "int64", float: "float64"}
+
+_set = object.__setattr__
+
+
+class ColumnarComponent(Component):
+    """
+    A component with numeric fields that is stored column by column.
+
+    In an `ArchetypeStorage` each field lives in a NumPy array,
+    so processors can update every matching entity at once with `System.get_columns`.
+    Components read back per entity are copies of the row, and assigning
+    to their fields writes into the row as well.
+    """
+
+    __slots__ = ("__sink",)
+
+    __columns__: ClassVar[dict[str, str]] = {}
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        try:
+            sink = self.__sink
+        except AttributeError:
+            return
+        sink(name, value)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        columns: dict[str, str] = {}
+        for name, field in cls.model_fields.items():
+            dtype = _DTYPES.get(field.annotation)
+            if dtype is None:
+                raise TypeError(
+                    f"Field {name!r} of {cls.__name__} must be a bool, int or float"
+                )
+            columns[name] = dtype
+        cls.__columns__ = columns
+
+    @classmethod
+    def from_columns(cls: type[T], columns: Mapping[str, Any], count: int) -> list[T]:
+        """Creates components from field columns without validation.
+
+        A column may be a sequence or array with one value per component,
+        or a single value shared by all of them. Missing fields use their default.
+        """
+        values: dict[str, list[Any]] = {}
+        for name, field in cls.model_fields.items():
+            if name in columns:
+                column = columns[name]
+            else:
+                column = field.get_default(call_default_factory=True)
+            if hasattr(column, "tolist"):
+                column = column.tolist()
+            if cls.__columns__[name] == "bool":
+                # Bool columns may come as bytes or integers, as in snapshots.
+                column = (
+                    list(map(bool, column))
+                    if isinstance(column, list)
+                    else bool(column)
+                )
+            values[name] = column if isinstance(column, list) else [column] * count
+        names = tuple(values)
+        rows = zip(*values.values()) if names else ((),) * count
+        if cls.__private_attributes__ or cls.__pydantic_post_init__ is not None:
+            return [cls.model_construct(**dict(zip(names, row))) for row in rows]
+        # Numeric fields need nothing of model_construct but its slots,
+        # which are set directly at about half the cost.
+        new = cls.__new__
+        fields_set = set(names)
+        components: list[T] = []
+        for row in rows:
+            component = new(cls)
+            _set(component, "__dict__", dict(zip(names, row)))
+            _set(component, "__pydantic_fields_set__", fields_set.copy())
+            _set(component, "__pydantic_extra__", None)
+            _set(component, "__pydantic_private__", None)
+            components.append(component)
+        return components
+
+
+def write_through(component: T, sink: Callable[[str, Any], object]) -> T:
+    """Makes the field assignments of a copy read from a table
+    also call `sink` with the field name and value."""
+    _set(component, "_ColumnarComponent__sink", sink)
+    return component
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Final
+
+from .component import Component
+
+if TYPE_CHECKING:
+    from .system import System
+
+_CREATE: Final = 0
+_ADD: Final = 1
+_REMOVE: Final = 2
+_DELETE: Final = 3
+
+
+class CommandBuffer:
+    """
+    Records structural changes to apply them to a system in one batch.
+
+    Commands whose entity or component is gone by the time they are applied
+    are skipped.
+    """
+
+    def __init__(self, system: System) -> None:
+        self.__system: Final = system
+        self.__commands: list[tuple[int, int, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.__commands)
+
+    def create_entity(self, *components: Component) -> int:
+        """Records the creation of an entity.
+
+        The id is reserved immediately, the components are added on apply.
+        """
+        entity = self.__system.reserve_entity()
+        self.__commands.append((_CREATE, entity, components))
+        return entity
+
+    def add_component(self, entity: int, component: Component) -> None:
+        """Records the addition of a component to an entity."""
+        self.__commands.append((_ADD, entity, component))
+
+    def remove_component(self, entity: int, component_type: type[Component]) -> None:
+        """Records the removal of a component from an entity."""
+        self.__commands.append((_REMOVE, entity, component_type))
+
+    def delete_entity(self, entity: int) -> None:
+        """Records the deletion of an entity."""
+        self.__commands.append((_DELETE, entity, None))
+
+    def apply(self) -> None:
+        """Applies all recorded commands in order and clears the buffer."""
+        commands = self.__commands
+        self.__commands = []
+        system = self.__system
+        for command, entity, argument in commands:
+            if not system.entity_exists(entity):
+                continue
+            if command == _CREATE:
+                system.spawn_entity(entity, *argument)
+            elif command == _ADD:
+                system.add_component(entity, argument)
+            elif command == _REMOVE:
+                if system.has_component(entity, argument):
+                    system.remove_component(entity, argument)
+            else:
+                system.delete_entity(entity, immediate=True)
+
+    def clear(self) -> None:
+        """Discards all recorded commands."""
+        self.__commands = []
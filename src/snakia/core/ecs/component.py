@@ -1,7 +1,15 @@
 from abc import ABC
+from typing import ClassVar
 
 from pydantic import BaseModel
 
 
 class Component(ABC, BaseModel):
-    pass
+    """
+    The base class of the components of a system.
+
+    Component types that are added and removed often can set `__sparse__ = True`
+    to be stored in sparse sets rather than archetype tables.
+    """
+
+    __sparse__: ClassVar[bool] = False
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
+
+if TYPE_CHECKING:
+    from .system import System
+
+RunCriterion = Callable[["System"], bool]
+"""A predicate deciding whether a processor or group runs in an update.
+
+Any callable taking the system works as a condition. A criterion with
+state may also have an `on_run(system)` method, called once what it
+guards has run in the update."""
+
+
+def record_run(criteria: Iterable[RunCriterion], system: System) -> None:
+    """Calls `on_run` on the criteria that have it,
+    after what they guard has run."""
+    for criterion in criteria:
+        on_run = getattr(criterion, "on_run", None)
+        if on_run is not None:
+            on_run(system)
+
+
+def every(ticks: int, offset: int = 0) -> RunCriterion:
+    """Runs on one update out of `ticks`, the first one being update `offset`."""
+    if ticks < 1:
+        raise ValueError("The number of ticks must be positive")
+    offset %= ticks
+
+    def criterion(system: System) -> bool:
+        return (system.tick - 1) % ticks == offset
+
+    return criterion
+
+
+def has_entities(*terms: Any) -> RunCriterion:
+    """Runs when the query of the given terms matches any entity.
+
+    With change terms, it runs when the query has changes it has not
+    yet seen. Checking does not mark them as seen."""
+
+    def criterion(system: System) -> bool:
+        return len(system.query(*terms)) > 0
+
+    return criterion
+
+
+def resource_changed(resource_type: type) -> RunCriterion:
+    """Runs when the resource of the given type was inserted, changed
+    or removed since what the criterion guards last ran in the system."""
+    return _ResourceChanged(resource_type)
+
+
+class _ResourceChanged:
+    # The version is only seen once the guarded processor has run, so a
+    # change is not lost when another criterion stops it from running.
+    __slots__ = ("__resource_type", "__seen", "__pending")
+
+    def __init__(self, resource_type: type) -> None:
+        self.__resource_type = resource_type
+        self.__seen: WeakKeyDictionary[System, int] = WeakKeyDictionary()
+        self.__pending: WeakKeyDictionary[System, int] = WeakKeyDictionary()
+
+    def __call__(self, system: System) -> bool:
+        version = system.resources.version(self.__resource_type)
+        if self.__seen.get(system, 0) == version:
+            return False
+        self.__pending[system] = version
+        return True
+
+    def on_run(self, system: System) -> None:
+        version = self.__pending.pop(system, None)
+        if version is not None:
+            self.__seen[system] = version
+
+
+def all_of(*criteria: RunCriterion) -> RunCriterion:
+    """Runs when all the criteria pass."""
+
+    def criterion(system: System) -> bool:
+        return all(c(system) for c in criteria)
+
+    return _forward_run(criterion, criteria)
+
+
+def any_of(*criteria: RunCriterion) -> RunCriterion:
+    """Runs when any of the criteria passes."""
+
+    def criterion(system: System) -> bool:
+        return any(c(system) for c in criteria)
+
+    return _forward_run(criterion, criteria)
+
+
+def negate(criterion: RunCriterion) -> RunCriterion:
+    """Runs when the criterion does not pass."""
+
+    def negated(system: System) -> bool:
+        return not criterion(system)
+
+    return _forward_run(negated, (criterion,))
+
+
+def _forward_run(
+    combined: RunCriterion, criteria: tuple[RunCriterion, ...]
+) -> RunCriterion:
+    if any(hasattr(c, "on_run") for c in criteria):
+        combined.on_run = lambda system: record_run(  # type: ignore[attr-defined]
+            criteria, system
+        )
+    return combined
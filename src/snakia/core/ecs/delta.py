@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Any, BinaryIO, Final
+
+from .component import Component
+from .snapshot import (
+    _read_column,
+    _read_header,
+    _Reader,
+    _resolve,
+    _type_name,
+    _write_column,
+    _write_header,
+    _Writer,
+)
+
+if TYPE_CHECKING:
+    from .system import System
+
+MAGIC: Final = b"SNKD"
+
+
+class Delta:  # noqa: R0903 # pylint: disable=R0903
+    """
+    The changes of a system between two calls of `DeltaRecorder.write`.
+    """
+
+    __slots__ = ("sequence", "created", "deleted", "removed", "changed")
+
+    def __init__(self, sequence: int) -> None:
+        self.sequence = sequence
+        self.created: list[int] = []
+        self.deleted: list[int] = []
+        self.removed: dict[type[Component], list[int]] = {}
+        self.changed: dict[type[Component], tuple[list[int], Any]] = {}
+
+    @classmethod
+    def read(cls, file: BinaryIO) -> Delta:
+        """Reads a delta written by `DeltaRecorder.write`."""
+        reader = _Reader(file)
+        _read_header(reader, MAGIC)
+        delta = cls(reader.u64())
+        delta.deleted = reader.array("Q").tolist()
+        delta.created = reader.array("Q").tolist()
+        for _ in range(reader.u16()):
+            component_type = _resolve(reader.name())
+            removed = reader.array("Q").tolist()
+            if removed:
+                delta.removed[component_type] = removed
+            entities = reader.array("Q").tolist()
+            if entities:
+                delta.changed[component_type] = (
+                    entities,
+                    _read_column(reader, component_type, len(entities)),
+                )
+        return delta
+
+
+class DeltaRecorder:
+    """
+    Records which entities and components of a system change,
+    and writes them as compact deltas.
+
+    Only the given component types are recorded, from the notifications
+    of the system: in-place changes must be reported with `System.mark_changed`.
+    A delta holds the values of the components when it is written,
+    so a component changed several times is written once.
+    """
+
+    def __init__(self, system: System, *component_types: type[Component]) -> None:
+        self.__system = system
+        self.__component_types = component_types
+        self.__sequence = 0
+        self.__created: set[int] = set()
+        self.__deleted: set[int] = set()
+        self.__changed: dict[type[Component], set[int]] = {}
+        self.__removed: dict[type[Component], set[int]] = {}
+        system.observe_entities(self)
+        for component_type in component_types:
+            system.observe(component_type, self)
+
+    @property
+    def sequence(self) -> int:
+        """The number of deltas written so far."""
+        return self.__sequence
+
+    def write(self, file: BinaryIO) -> None:
+        """Writes the changes recorded since the last delta and starts a new one."""
+        writer = _Writer(file)
+        _write_header(writer, MAGIC)
+        writer.u64(self.__sequence)
+        writer.array(array("Q", self.__deleted))
+        writer.array(array("Q", self.__created))
+        component_types = self.__changed.keys() | self.__removed.keys()
+        writer.u16(len(component_types))
+        storage = self.__system.storage
+        for component_type in component_types:
+            writer.name(_type_name(component_type))
+            writer.array(array("Q", self.__removed.get(component_type, ())))
+            entities = self.__changed.get(component_type, set())
+            components = [storage.get_component(e, component_type) for e in entities]
+            writer.array(array("Q", entities))
+            if entities:
+                _write_column(writer, component_type, components)
+        self.__sequence += 1
+        self.clear()
+
+    def clear(self) -> None:
+        """Drops the recorded changes."""
+        self.__created = set()
+        self.__deleted = set()
+        self.__changed = {}
+        self.__removed = {}
+
+    def close(self) -> None:
+        """Stops recording."""
+        self.__system.unobserve_entities(self)
+        for component_type in self.__component_types:
+            self.__system.unobserve(component_type, self)
+
+    def on_entity_created(self, entity: int, /) -> None:
+        self.__created.add(entity)
+
+    def on_entity_deleted(self, entity: int, /) -> None:
+        for entities in (*self.__changed.values(), *self.__removed.values()):
+            entities.discard(entity)
+        if entity in self.__created:
+            self.__created.discard(entity)
+        else:
+            self.__deleted.add(entity)
+
+    def on_component_added(self, entity: int, component: Component, /) -> None:
+        component_type = type(component)
+        self.__changed.setdefault(component_type, set()).add(entity)
+        self.__removed.get(component_type, set()).discard(entity)
+
+    def on_component_changed(self, entity: int, component: Component, /) -> None:
+        self.on_component_added(entity, component)
+
+    def on_component_removed(self, entity: int, component: Component, /) -> None:
+        component_type = type(component)
+        self.__changed.get(component_type, set()).discard(entity)
+        self.__removed.setdefault(component_type, set()).add(entity)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from typing import Final
+
+INDEX_BITS: Final = 32
+INDEX_MASK: Final = (1 << INDEX_BITS) - 1
+
+
+class EntityPool:
+    """
+    Allocates entity ids from recycled slots.
+
+    An id packs the slot index into its low 32 bits and the slot generation
+    above them. Releasing an entity bumps the generation of its slot,
+    so ids that outlive their entity are detected as stale,
+    and the index range stays bounded by the peak number of live entities.
+    """
+
+    __slots__ = ("__generations", "__alive", "__free", "__count")
+
+    def __init__(self) -> None:
+        # Slot 0 is never used, so the first id is 1 and 0 is never a valid id.
+        self.__generations: list[int] = [0]
+        self.__alive = bytearray(1)
+        self.__free: list[int] = []
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return self.__count
+
+    @property
+    def capacity(self) -> int:
+        """The number of slots allocated so far."""
+        return len(self.__generations) - 1
+
+    @staticmethod
+    def index(entity: int) -> int:
+        """Returns the slot index of an entity id."""
+        return entity & INDEX_MASK
+
+    @staticmethod
+    def generation(entity: int) -> int:
+        """Returns the generation of an entity id."""
+        return entity >> INDEX_BITS
+
+    def create(self) -> int:
+        """Allocates a new entity id, reusing a free slot if there is one."""
+        free = self.__free
+        alive = self.__alive
+        while free:
+            # Claimed slots stay in the free list until they are popped.
+            index = free.pop()
+            if not alive[index]:
+                break
+        else:
+            index = len(self.__generations)
+            self.__generations.append(0)
+            alive.append(0)
+        alive[index] = 1
+        self.__count += 1
+        return (self.__generations[index] << INDEX_BITS) | index
+
+    def create_many(self, count: int) -> list[int]:
+        """Allocates the given number of entity ids at once."""
+        free = self.__free
+        generations = self.__generations
+        alive = self.__alive
+        reused: list[int] = []
+        while free and len(reused) < count:
+            index = free.pop()
+            if not alive[index]:
+                alive[index] = 1
+                reused.append(index)
+        start = len(generations)
+        added = count - len(reused)
+        generations.extend([0] * added)
+        alive.extend(b"\x01" * added)
+        self.__count += count
+        entities = [(generations[index] << INDEX_BITS) | index for index in reused]
+        entities.extend(range(start, start + added))
+        return entities
+
+    def dump(self) -> tuple[array[int], bytes, array[int]]:
+        """Returns the slot generations, alive flags and free slots."""
+        return (
+            array("Q", self.__generations),
+            bytes(self.__alive),
+            array("I", self.__free),
+        )
+
+    def load(self, generations: array[int], alive: bytes, free: array[int]) -> None:
+        """Replaces the state of the pool with the output of `dump`."""
+        self.__generations = generations.tolist()
+        self.__alive = bytearray(alive)
+        self.__free = free.tolist()
+        self.__count = self.__alive.count(1)
+
+    def claim(self, entity: int) -> None:
+        """Marks the given id as alive, to mirror an entity of another pool."""
+        index = entity & INDEX_MASK
+        generation = entity >> INDEX_BITS
+        if index == 0:
+            raise ValueError("Entity 0 is not a valid id")
+        generations = self.__generations
+        if index >= len(generations):
+            start = len(generations)
+            generations.extend([0] * (index + 1 - start))
+            self.__alive.extend(bytes(index + 1 - start))
+            self.__free.extend(range(index - 1, start - 1, -1))
+        if self.__alive[index]:
+            if generations[index] == generation:
+                return
+            raise KeyError(f"The slot of entity {entity} is in use")
+        generations[index] = generation
+        self.__alive[index] = 1
+        self.__count += 1
+
+    def release(self, entity: int) -> None:
+        """Frees the slot of an entity, making its id stale."""
+        if not self.is_alive(entity):
+            raise KeyError(f"Entity {entity} does not exist")
+        index = entity & INDEX_MASK
+        self.__generations[index] += 1
+        self.__alive[index] = 0
+        self.__free.append(index)
+        self.__count -= 1
+
+    def release_many(self, entities: Iterable[int]) -> list[int]:
+        """Frees the slots of the live entities among the given ones,
+        and returns those entities, skipping stale and repeated ids."""
+        generations = self.__generations
+        alive = self.__alive
+        size = len(generations)
+        released: list[int] = []
+        freed: list[int] = []
+        for entity in entities:
+            index = entity & INDEX_MASK
+            if (
+                0 < index < size
+                and alive[index]
+                and generations[index] == entity >> INDEX_BITS
+            ):
+                generations[index] += 1
+                alive[index] = 0
+                freed.append(index)
+                released.append(entity)
+        self.__free.extend(freed)
+        self.__count -= len(freed)
+        return released
+
+    def is_alive(self, entity: int) -> bool:
+        """Returns True if the id belongs to a live entity."""
+        index = entity & INDEX_MASK
+        return (
+            0 < index < len(self.__generations)
+            and self.__alive[index] == 1
+            and self.__generations[index] == entity >> INDEX_BITS
+        )
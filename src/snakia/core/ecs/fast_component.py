@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import copy
+from abc import ABCMeta
+from dataclasses import dataclass, fields
+from functools import cache
+from typing import TYPE_CHECKING, Any, ClassVar, TypeVar
+
+from pydantic import TypeAdapter
+
+from .component import Component
+
+T = TypeVar("T", bound="FastComponent")
+
+if TYPE_CHECKING:
+    _Base = Component
+else:
+    _Base = object
+
+
+class FastComponentType(ABCMeta):
+    """
+    A metaclass that turns every subclass into a slotted keyword-only dataclass.
+    """
+
+    def __new__(
+        mcs,
+        name: str,
+        bases: tuple[type, ...],
+        namespace: dict[str, Any],
+        /,
+        **kwargs: Any,
+    ) -> type:
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        if "__slots__" in namespace:
+            return cls
+        return dataclass(slots=True, kw_only=True)(cls)
+
+
+@cache
+def _adapter(cls: type[T]) -> TypeAdapter[T]:
+    return TypeAdapter(cls)
+
+
+class FastComponent(_Base, metaclass=FastComponentType):  # type: ignore[misc]
+    """
+    A slotted component without validation on construction or assignment.
+
+    Fields are declared like on `Component` and can be used with `System`
+    in the same way. Validation only happens at explicit boundaries:
+    `model_validate` and `validate`.
+    """
+
+    __slots__ = ()
+    __sparse__: ClassVar[bool] = False
+
+    @classmethod
+    def model_validate(cls: type[T], obj: Any) -> T:
+        """Validates the given data and creates a component from it."""
+        return _adapter(cls).validate_python(obj)
+
+    def model_dump(self) -> dict[str, Any]:
+        """Returns the fields of the component as a dict."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    def model_copy(self: T) -> T:
+        """Returns a shallow copy of the component."""
+        return copy.copy(self)
+
+    def validate(self) -> None:
+        """Validates the current field values.
+
+        Raises:
+            pydantic.ValidationError: If a field value is invalid.
+        """
+        _adapter(type(self)).validate_python(self.model_dump())
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING
+
+from .component import Component
+
+if TYPE_CHECKING:
+    from .system import System
+
+
+class Hierarchy:  # noqa: R0902 # pylint: disable=R0902
+    """
+    Parent and child relations between the entities of a system.
+
+    The entities are kept in depth-first order, where each subtree is a
+    contiguous run, and entities whose transform changed are flagged dirty,
+    so `propagate` walks only the runs of the changed subtrees.
+    Deleting an entity deletes its descendants.
+    """
+
+    def __init__(self, system: System) -> None:
+        self.__system = system
+        self.__parents: dict[int, int] = {}
+        self.__children: dict[int, list[int]] = {}
+        self.__order: list[int] = []
+        self.__ends: list[int] = []
+        self.__positions: dict[int, int] = {}
+        self.__ordered = True
+        self.__dirty: set[int] = set()
+        self.__tracked: list[type[Component]] = []
+        system.observe_entities(self)
+
+    def __len__(self) -> int:
+        return len(self.__ordered_entities())
+
+    def __iter__(self) -> Iterator[int]:
+        """Yields the entities that have a parent or children,
+        each subtree in depth-first order."""
+        return iter(self.__ordered_entities())
+
+    def __contains__(self, entity: object) -> bool:
+        return entity in self.__parents or entity in self.__children
+
+    def set_parent(self, child: int, parent: int | None) -> None:
+        """Attaches an entity to a parent, or detaches it if the parent is None."""
+        current = self.__parents.get(child)
+        if current == parent:
+            return
+        if parent is not None:
+            if not self.__system.entity_exists(parent):
+                raise KeyError(f"Entity {parent} does not exist")
+            ancestor: int | None = parent
+            while ancestor is not None:
+                if ancestor == child:
+                    raise ValueError(f"Entity {parent} descends from {child}")
+                ancestor = self.__parents.get(ancestor)
+        if current is not None:
+            self.__detach(child, current)
+        if parent is not None:
+            self.__parents[child] = parent
+            self.__children.setdefault(parent, []).append(child)
+        self.__ordered = False
+        self.__dirty.add(child)
+
+    def get_parent(self, entity: int) -> int | None:
+        """Returns the parent of an entity."""
+        return self.__parents.get(entity)
+
+    def get_children(self, entity: int) -> tuple[int, ...]:
+        """Returns the children of an entity, in the order they were attached."""
+        return tuple(self.__children.get(entity, ()))
+
+    def get_depth(self, entity: int) -> int:
+        """Returns the number of ancestors of an entity."""
+        depth = 0
+        parents = self.__parents
+        while entity in parents:
+            entity = parents[entity]
+            depth += 1
+        return depth
+
+    def descendants(self, entity: int) -> Iterator[int]:
+        """Yields the descendants of an entity, parents before their children."""
+        pending = list(self.__children.get(entity, ()))
+        children = self.__children
+        for descendant in pending:
+            yield descendant
+            pending.extend(children.get(descendant, ()))
+
+    def mark_dirty(self, entity: int) -> None:
+        """Flags the transform of an entity as changed."""
+        self.__dirty.add(entity)
+
+    def track(self, *component_types: type[Component]) -> None:
+        """Flags entities as dirty whenever a component of the given types
+        is added, replaced or reported with `System.mark_changed`.
+        """
+        for component_type in component_types:
+            if component_type not in self.__tracked:
+                self.__tracked.append(component_type)
+                self.__system.observe(component_type, self)
+
+    def propagate(self, update: Callable[[int, int | None], object]) -> int:
+        """Calls `update(entity, parent)` for every dirty entity and its
+        descendants, parents first, then clears the dirty flags.
+
+        The parent is None for entities without one.
+        Returns the number of entities updated.
+        """
+        dirty = self.__dirty
+        if not dirty:
+            return 0
+        self.__dirty = set()
+        order = self.__ordered_entities()
+        ends = self.__ends
+        positions = self.__positions
+        parents = self.__parents
+        count = 0
+        starts: list[int] = []
+        for entity in dirty:
+            position = positions.get(entity)
+            if position is None:
+                # Entities outside the hierarchy have nothing to propagate to.
+                if self.__system.entity_exists(entity):
+                    update(entity, None)
+                    count += 1
+            else:
+                starts.append(position)
+        starts.sort()
+        end = 0
+        for start in starts:
+            if start < end:
+                # Inside a subtree that was already updated.
+                continue
+            end = ends[start]
+            for entity in order[start:end]:
+                update(entity, parents.get(entity))
+            count += end - start
+        return count
+
+    def clear(self) -> None:
+        """Removes all relations and dirty flags."""
+        self.__parents = {}
+        self.__children = {}
+        self.__order = []
+        self.__ends = []
+        self.__positions = {}
+        self.__ordered = True
+        self.__dirty = set()
+
+    def close(self) -> None:
+        """Stops following the system."""
+        self.__system.unobserve_entities(self)
+        for component_type in self.__tracked:
+            self.__system.unobserve(component_type, self)
+        self.__tracked = []
+
+    def on_entity_created(self, entity: int, /) -> None:
+        pass
+
+    def on_entity_deleted(self, entity: int, /) -> None:
+        self.__dirty.discard(entity)
+        parent = self.__parents.get(entity)
+        if parent is not None:
+            self.__detach(entity, parent)
+            self.__ordered = False
+        if entity not in self.__children:
+            return
+        descendants = list(self.descendants(entity))
+        # The relations of the whole subtree are dropped first, so deleting
+        # the descendants does not cascade again, however deep the tree is.
+        del self.__children[entity]
+        for descendant in descendants:
+            del self.__parents[descendant]
+            self.__children.pop(descendant, None)
+            self.__dirty.discard(descendant)
+        self.__ordered = False
+        system = self.__system
+        system.delete_entities(
+            descendant
+            for descendant in reversed(descendants)
+            if system.entity_exists(descendant)
+        )
+
+    def on_component_added(self, entity: int, _: Component, /) -> None:
+        self.__dirty.add(entity)
+
+    def on_component_changed(self, entity: int, _: Component, /) -> None:
+        self.__dirty.add(entity)
+
+    def on_component_removed(self, entity: int, _: Component, /) -> None:
+        pass
+
+    def __detach(self, child: int, parent: int) -> None:
+        del self.__parents[child]
+        siblings = self.__children[parent]
+        siblings.remove(child)
+        if not siblings:
+            del self.__children[parent]
+
+    def __ordered_entities(self) -> list[int]:
+        if self.__ordered:
+            return self.__order
+        parents = self.__parents
+        children = self.__children
+        order: list[int] = []
+        pending = [entity for entity in children if entity not in parents]
+        pending.reverse()
+        while pending:
+            entity = pending.pop()
+            order.append(entity)
+            pending.extend(reversed(children.get(entity, ())))
+        positions = {entity: index for index, entity in enumerate(order)}
+        # A subtree ends where the last of its descendants does, and the
+        # descendants of an entity come after it in depth-first order.
+        ends = list(range(1, len(order) + 1))
+        for index in range(len(order) - 1, -1, -1):
+            parent = parents.get(order[index])
+            if parent is not None:
+                position = positions[parent]
+                if ends[index] > ends[position]:
+                    ends[position] = ends[index]
+        self.__order = order
+        self.__ends = ends
+        self.__positions = positions
+        self.__ordered = True
+        return order
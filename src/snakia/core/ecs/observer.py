@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+from .component import Component
+
+
+class ComponentObserver(Protocol):
+    """Observer of the components of one type in a system."""
+
+    def on_component_added(self, entity: int, component: Component, /) -> None:
+        """Called after a component is added to an entity."""
+
+    def on_component_changed(self, entity: int, component: Component, /) -> None:
+        """Called after a component is replaced or marked as changed."""
+
+    def on_component_removed(self, entity: int, component: Component, /) -> None:
+        """Called after a component is removed from an entity."""
+
+
+class EntityObserver(Protocol):
+    """Observer of the entities of a system."""
+
+    def on_entity_created(self, entity: int, /) -> None:
+        """Called after an entity is stored, before its components are reported."""
+
+    def on_entity_deleted(self, entity: int, /) -> None:
+        """Called after an entity is deleted and its components are reported."""
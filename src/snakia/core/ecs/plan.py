@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from heapq import heapify, heappop, heappush
+from typing import TYPE_CHECKING
+
+from .processor import Processor
+
+if TYPE_CHECKING:
+    from .component import Component
+
+
+class ExecutionPlan:  # noqa: R0903 # pylint: disable=R0903
+    """
+    The order in which the processors of a system run.
+
+    Each processor runs after the processors matching its `after` types
+    and before the ones matching its `before` types.
+    Processors without constraints between them keep the order they were added in.
+    Each stage comes after the stages of the earlier processors it conflicts with,
+    so running the stages in parallel gives the results of running in order.
+    The plan is `conditional` if any processor has run criteria or a group.
+    """
+
+    __slots__ = ("processors", "stages", "conditional")
+
+    def __init__(self, processors: Iterable[Processor]) -> None:
+        processors = list(processors)
+        self.conditional = any(
+            processor.run_if or processor.group is not None for processor in processors
+        )
+        by_type: dict[type, list[int]] = {}
+        for index, processor in enumerate(processors):
+            for cls in type(processor).__mro__:
+                by_type.setdefault(cls, []).append(index)
+        successors: list[set[int]] = [set() for _ in processors]
+        predecessors: list[set[int]] = [set() for _ in processors]
+        for index, processor in enumerate(processors):
+            for after_cls in processor.after:
+                for other in by_type.get(after_cls, ()):
+                    if other == index:
+                        continue
+                    successors[other].add(index)
+                    predecessors[index].add(other)
+            for before_cls in processor.before:
+                for other in by_type.get(before_cls, ()):
+                    if other == index:
+                        continue
+                    successors[index].add(other)
+                    predecessors[other].add(index)
+        order = _toposort(successors, predecessors)
+        self.processors: tuple[Processor, ...] = tuple(processors[i] for i in order)
+        stages = _place(processors, order, predecessors)
+        self.stages: tuple[tuple[Processor, ...], ...] = tuple(map(tuple, stages))
+
+
+def _place(
+    processors: list[Processor], order: list[int], predecessors: list[set[int]]
+) -> list[list[Processor]]:
+    # The last stage that reads or writes each type, and the last stage of a
+    # processor without declared access, bound the stage of each processor,
+    # so placing one costs O(its accesses) rather than O(stages).
+    stages: list[list[Processor]] = []
+    stage_of: dict[int, int] = {}
+    last_read: dict[type[Component], int] = {}
+    last_write: dict[type[Component], int] = {}
+    last_exclusive = -1
+    for index in order:
+        processor = processors[index]
+        stage = max((stage_of[i] + 1 for i in predecessors[index]), default=0)
+        if processor.declares_access:
+            # A processor must run after every earlier processor it conflicts
+            # with, or enabling workers would change what it sees.
+            reads = processor.reads or ()
+            writes = processor.writes or ()
+            stage = max(
+                stage,
+                last_exclusive + 1,
+                *(last_write.get(t, -1) + 1 for t in (*reads, *writes)),
+                *(last_read.get(t, -1) + 1 for t in writes),
+            )
+        else:
+            stage = max(stage, len(stages))
+            last_exclusive = stage
+        if stage == len(stages):
+            stages.append([])
+        stages[stage].append(processor)
+        stage_of[index] = stage
+        if processor.declares_access:
+            for component_type in processor.reads or ():
+                last_read[component_type] = max(
+                    last_read.get(component_type, -1), stage
+                )
+            for component_type in processor.writes or ():
+                last_write[component_type] = max(
+                    last_write.get(component_type, -1), stage
+                )
+    return stages
+
+
+def _toposort(successors: list[set[int]], predecessors: list[set[int]]) -> list[int]:
+    degrees = [len(p) for p in predecessors]
+    ready = [index for index, degree in enumerate(degrees) if degree == 0]
+    heapify(ready)
+    order: list[int] = []
+    while ready:
+        index = heappop(ready)
+        order.append(index)
+        for successor in successors[index]:
+            degrees[successor] -= 1
+            if degrees[successor] == 0:
+                heappush(ready, successor)
+    if len(order) != len(degrees):
+        raise ValueError("The processor order constraints contain a cycle")
+    return order
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import copy
+from collections.abc import Callable, Mapping
+from functools import partial
+from typing import Any, Final
+
+from .columnar import ColumnarComponent
+from .component import Component
+from .fast_component import FastComponent
+from .tag import is_tag
+
+_IMMUTABLE: Final = (int, float, complex, str, bytes, bool, type(None), frozenset)
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, tuple):
+        return all(_is_immutable(item) for item in value)
+    return isinstance(value, _IMMUTABLE)
+
+
+def _deep_init(
+    component_type: type[FastComponent], values: dict[str, Any]
+) -> FastComponent:
+    return component_type(**copy.deepcopy(values))
+
+
+def _factory(component: Component) -> Callable[[], Component]:
+    values = component.model_dump()
+    shared = all(_is_immutable(value) for value in values.values())
+    if isinstance(component, FastComponent):
+        # The generated __init__ of a fast component is its cheapest copy.
+        if shared:
+            return partial(type(component), **values)
+        return partial(_deep_init, type(component), values)  # type: ignore
+    if shared:
+        return component.model_copy
+    return partial(component.model_copy, deep=True)
+
+
+class Prefab:
+    """
+    A validated set of components that entities are created from.
+
+    The components are validated once, when the prefab is made.
+    Instances get the fields of columnar components as filled columns,
+    and shallow copies of the other components, or deep copies
+    for components that hold mutable values. Tags are shared.
+
+    Archetype and table storages copy the columns without creating
+    components; a `DictStorage` still builds one component per entity,
+    so the gain over creating entities one by one is smaller there.
+    """
+
+    __slots__ = ("name", "components", "__fields", "__factories")
+
+    def __init__(self, name: str, *components: Component) -> None:
+        types = [type(component) for component in components]
+        if len(set(types)) != len(types):
+            raise ValueError(f"Prefab {name} has several components of a type")
+        self.name = name
+        self.components: tuple[Component, ...] = tuple(
+            (
+                component
+                if is_tag(type(component))
+                else type(component).model_validate(component.model_dump())
+            )
+            for component in components
+        )
+        self.__fields: dict[type[Component], dict[str, Any]] = {}
+        self.__factories: dict[type[Component], Callable[[], Component]] = {}
+        for component in self.components:
+            component_type = type(component)
+            if issubclass(component_type, ColumnarComponent):
+                self.__fields[component_type] = component.model_dump()
+            elif not is_tag(component_type):
+                self.__factories[component_type] = _factory(component)
+
+    def __repr__(self) -> str:
+        return f"Prefab({self.name!r}, {', '.join(map(repr, self.components))})"
+
+    def columns(
+        self, count: int, overrides: Mapping[type[Component], Any] | None = None
+    ) -> dict[type[Component], Any]:
+        """Returns the columns of `count` instances, as taken by
+        `System.create_entities_from_columns`.
+
+        Overrides replace the column of a type, or some fields
+        of a columnar type when they map field names to values or arrays.
+        """
+        overrides = overrides or {}
+        columns: dict[type[Component], Any] = {}
+        for component in self.components:
+            component_type = type(component)
+            override = overrides.get(component_type)
+            fields = self.__fields.get(component_type)
+            if fields is not None:
+                if isinstance(override, Mapping):
+                    columns[component_type] = {**fields, **override}
+                else:
+                    columns[component_type] = fields if override is None else override
+            elif override is not None:
+                columns[component_type] = override
+            elif component_type in self.__factories:
+                factory = self.__factories[component_type]
+                columns[component_type] = [factory() for _ in range(count)]
+            else:
+                columns[component_type] = [component] * count
+        for component_type, override in overrides.items():
+            columns.setdefault(component_type, override)
+        return columns
@@ -4,16 +4,34 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, ClassVar
 
 if TYPE_CHECKING:
+    from .component import Component
+    from .criteria import RunCriterion
     from .system import System
 
 
 class Processor(ABC):
     """
     A processor is a class that processes the system.
+
+    Processors that declare the component types they `reads` and `writes`
+    can run in parallel with processors they do not conflict with.
+    Processors that declare neither are run alone.
+
+    A processor only runs in the updates where all its `run_if` criteria
+    pass, and the criteria of its `group`, set with `System.set_group_criteria`.
     """
 
     before: ClassVar[tuple[type[Processor], ...]] = ()
     after: ClassVar[tuple[type[Processor], ...]] = ()
+    reads: ClassVar[tuple[type[Component], ...] | None] = None
+    writes: ClassVar[tuple[type[Component], ...] | None] = None
+    group: ClassVar[str | None] = None
+    run_if: ClassVar[tuple[RunCriterion, ...]] = ()
+
+    @property
+    def declares_access(self) -> bool:
+        """Returns True if the processor declares the components it accesses."""
+        return self.reads is not None or self.writes is not None
 
     @abstractmethod
     def process(self, system: System) -> None:
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Final
+
+from .processor import Processor
+
+if TYPE_CHECKING:
+    from .system import System
+
+BUCKETS: Final = 24
+"""Histogram buckets: up to 1 µs, then doubling up to about 8 s."""
+
+
+class ProcessorStats:  # noqa: R0902 # pylint: disable=R0902
+    """
+    The timings of one processor, over all its runs and a rolling window.
+    """
+
+    __slots__ = (
+        "name",
+        "calls",
+        "total",
+        "last",
+        "max",
+        "changes",
+        "last_changes",
+        "queries",
+        "__window",
+        "__buckets",
+        "__histogram",
+    )
+
+    def __init__(self, name: str, window: int) -> None:
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+        self.changes = 0
+        self.last_changes = 0
+        self.queries: dict[str, int] = {}
+        self.__window: deque[float] = deque(maxlen=window)
+        self.__buckets: deque[int] = deque(maxlen=window)
+        self.__histogram = [0] * BUCKETS
+
+    @property
+    def mean(self) -> float:
+        """The mean duration of all runs, in seconds."""
+        return self.total / self.calls if self.calls else 0.0
+
+    def add(self, duration: float) -> None:
+        """Records the duration of a run."""
+        bucket = int(duration * 1e6).bit_length()
+        if bucket >= BUCKETS:
+            bucket = BUCKETS - 1
+        buckets = self.__buckets
+        histogram = self.__histogram
+        if len(buckets) == buckets.maxlen:
+            histogram[buckets[0]] -= 1
+        buckets.append(bucket)
+        histogram[bucket] += 1
+        self.__window.append(duration)
+        self.calls += 1
+        self.total += duration
+        self.last = duration
+        self.max = max(self.max, duration)
+
+    def percentile(self, percent: float) -> float:
+        """Returns a percentile of the durations in the window, in seconds."""
+        if not self.__window:
+            return 0.0
+        durations = sorted(self.__window)
+        index = round(percent / 100 * (len(durations) - 1))
+        return durations[min(max(index, 0), len(durations) - 1)]
+
+    def histogram(self) -> list[tuple[float, int]]:
+        """Returns the durations in the window as (upper bound in seconds, count)
+        pairs of doubling buckets, without the empty ones."""
+        return [
+            ((1 << bucket) / 1e6, count)
+            for bucket, count in enumerate(self.__histogram)
+            if count
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the stats as plain data."""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "total": self.total,
+            "mean": self.mean,
+            "last": self.last,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "histogram": self.histogram(),
+            "changes": self.changes,
+            "last_changes": self.last_changes,
+            "queries": dict(self.queries),
+        }
+
+
+class Profiler:
+    """
+    Measures each processor run of a system, once enabled
+    with `System.enable_profiling`.
+
+    For every processor it keeps the durations of the last `window` runs,
+    the number of entities matched by each query it made, and the number
+    of structural changes made by it and its commands. Structural changes
+    made through commands after a parallel stage are not attributed.
+
+    Args:
+        window (int): The number of runs kept per processor.
+        path (str | os.PathLike[str] | None): A file that the stats
+            are written to as JSON every `dump_every` updates.
+        dump_every (int): The number of updates between two dumps.
+    """
+
+    def __init__(
+        self,
+        window: int = 256,
+        path: str | os.PathLike[str] | None = None,
+        dump_every: int = 100,
+    ) -> None:
+        self.__window = window
+        self.__path = path
+        self.__dump_every = dump_every
+        self.__updates = 0
+        self.__stats: dict[int, ProcessorStats] = {}
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    @property
+    def updates(self) -> int:
+        """The number of updates measured."""
+        return self.__updates
+
+    def get(self, processor: Processor) -> ProcessorStats | None:
+        """Returns the stats of a processor."""
+        return self.__stats.get(id(processor))
+
+    def report(self) -> list[ProcessorStats]:
+        """Returns the stats of all processors, the slowest first."""
+        return sorted(self.__stats.values(), key=lambda stats: -stats.total)
+
+    def dump(self, path: str | os.PathLike[str] | None = None) -> None:
+        """Writes the stats to a file as JSON."""
+        path = path if path is not None else self.__path
+        if path is None:
+            raise ValueError("No file to dump the stats to")
+        data = {
+            "updates": self.__updates,
+            "processors": [stats.as_dict() for stats in self.report()],
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+    def clear(self) -> None:
+        """Drops all stats."""
+        self.__stats = {}
+        self.__updates = 0
+
+    def run(self, processor: Processor, system: System) -> ProcessorStats:
+        """Runs a processor and records its duration."""
+        stats = self.__stats.get(id(processor))
+        if stats is None:
+            with self.__lock:
+                stats = self.__stats.setdefault(
+                    id(processor),
+                    ProcessorStats(type(processor).__qualname__, self.__window),
+                )
+        local = self.__local
+        local.stats = stats
+        start = time.perf_counter()
+        try:
+            processor.process(system)
+        finally:
+            stats.add(time.perf_counter() - start)
+            local.stats = None
+        return stats
+
+    def record_query(self, name: str, count: int) -> None:
+        """Records the number of entities matched by a query
+        of the processor running in this thread.
+
+        For a query with change terms, this is the number of changes
+        it has not yet seen."""
+        stats = getattr(self.__local, "stats", None)
+        if stats is not None:
+            stats.queries[name] = count
+
+    def record_changes(self, stats: ProcessorStats, count: int) -> None:
+        """Records the structural changes made by a run."""
+        stats.changes += count
+        stats.last_changes = count
+
+    def end_update(self) -> None:
+        """Counts an update and dumps the stats when they are due."""
+        self.__updates += 1
+        if self.__path is not None and self.__updates % self.__dump_every == 0:
+            self.dump()
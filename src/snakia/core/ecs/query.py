@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import Any, Final, Generic, TypeVar
+
+from .change_tracker import ChangeLog, ChangeTracker
+from .component import Component
+from .storage import ArchetypeStorage, Storage
+from .storage.sparse_set import is_sparse
+from .terms import Added, ChangeTerm, Optional, Or, Removed, Term, Without
+
+T = TypeVar("T", bound=tuple[Any, ...])
+
+CHUNK_SIZE: Final = 1024
+
+
+class Query(Generic[T]):  # noqa: R0902 # pylint: disable=R0902
+    """
+    A cached set of the entities that have all the given components.
+
+    The system keeps the set up to date as components are added and removed,
+    so iterating a query costs O(matches). Entities and components may be
+    added or removed while iterating: entities that stop matching are skipped
+    and those that start matching are left for the next iteration.
+
+    Queries with change terms (`Added`, `Changed`, `Removed`) only yield
+    the entities that changed since the query last ran, at O(changes) cost.
+    Their length counts those pending changes without consuming them.
+
+    `Without` and `Or` terms filter entities by component types alone
+    and yield nothing; `Optional` terms yield None for missing components.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        terms: tuple[type[Component] | Term, ...],
+        tracker: ChangeTracker,
+    ) -> None:
+        self.__storage = storage
+        self.__tracker = tracker
+        elements = [term for term in terms if not isinstance(term, (Without, Or))]
+        self.__component_types = tuple(
+            term.component_type if isinstance(term, Term) else term for term in elements
+        )
+        self.__required = tuple(
+            component_type
+            for term, component_type in zip(elements, self.__component_types)
+            if not isinstance(term, (Removed, Optional))
+        )
+        self.__excluded = tuple(
+            term.component_type for term in terms if isinstance(term, Without)
+        )
+        self.__groups = tuple(
+            term.component_types for term in terms if isinstance(term, Or)
+        )
+        self.__optional = any(isinstance(term, Optional) for term in elements)
+        self.__terms = terms
+        self.__change_terms: list[tuple[ChangeTerm, ChangeLog]] = []
+        self.__removed: list[tuple[int, ChangeLog]] = []
+        for index, term in enumerate(elements):
+            if not isinstance(term, ChangeTerm):
+                continue
+            log = tracker.get_log(term.component_type)
+            if log is None:
+                raise ValueError(f"Changes of {term} are not tracked")
+            self.__change_terms.append((term, log))
+            if isinstance(term, Removed):
+                self.__removed.append((index, log))
+        self.__entities: set[int] = set()
+        self.__matching = bool(self.__required or self.__groups)
+        if self.__matching:
+            self.__entities = storage.match_entities(
+                self.__required, self.__excluded, self.__groups
+            )
+        elif not self.__change_terms:
+            raise ValueError("A query needs a component type to match entities on")
+        self.last_run = tracker.advance() if self.__change_terms else 0
+        self.__fetch = storage.fetcher(self.__component_types)
+        self.__by_archetype = (
+            isinstance(storage, ArchetypeStorage)
+            and self.__matching
+            and not self.__change_terms
+            and not any(map(is_sparse, (*self.observed_types, *self.__component_types)))
+        )
+
+    @property
+    def component_types(self) -> tuple[type[Component], ...]:
+        """The component types of the query."""
+        return self.__component_types
+
+    @property
+    def observed_types(self) -> frozenset[type[Component]]:
+        """The component types that decide which entities match."""
+        return frozenset(
+            (*self.__required, *self.__excluded, *(t for g in self.__groups for t in g))
+        )
+
+    @property
+    def terms(self) -> tuple[type[Component] | Term, ...]:
+        """The terms of the query."""
+        return self.__terms
+
+    def __len__(self) -> int:
+        if self.__change_terms:
+            return sum(1 for _ in self.__pending(self.last_run))
+        return len(self.__entities)
+
+    def __contains__(self, entity: object) -> bool:
+        if self.__change_terms:
+            return entity in self.__pending(self.last_run)
+        return entity in self.__entities
+
+    def __iter__(self) -> Iterator[tuple[int, T]]:
+        if self.__change_terms:
+            return self.__iter_changes()
+        return self.__iter_entities()
+
+    def iter_chunks(
+        self, size: int = CHUNK_SIZE
+    ) -> Iterator[tuple[list[int], tuple[Sequence[Any], ...]]]:
+        """Yields blocks of at most `size` entities with a sequence of components
+        per term, aligned with the entities.
+
+        With an `ArchetypeStorage` blocks follow the archetype tables,
+        and columnar components come as column views that write into storage.
+        """
+        if size < 1:
+            raise ValueError("The chunk size must be positive")
+        if self.__change_terms:
+            return self.__iter_change_chunks(size)
+        if self.__by_archetype:
+            return self.__storage.query_chunks(  # type: ignore
+                self.__component_types,
+                size,
+                self.__required,
+                self.__excluded,
+                self.__groups,
+            )
+        return self.__iter_entity_chunks(size)
+
+    def __iter_entity_chunks(
+        self, size: int
+    ) -> Iterator[tuple[list[int], tuple[Sequence[Any], ...]]]:
+        entities = list(self.__entities)
+        fetch_chunk = self.__storage.fetch_chunk
+        for start in range(0, len(entities), size):
+            chunk = entities[start : start + size]
+            yield chunk, fetch_chunk(chunk, self.__component_types)
+
+    def __iter_change_chunks(
+        self, size: int
+    ) -> Iterator[tuple[list[int], tuple[Sequence[Any], ...]]]:
+        entities: list[int] = []
+        rows: list[tuple[Any, ...]] = []
+        for entity, components in self.__iter_changes():
+            entities.append(entity)
+            rows.append(components)
+            if len(entities) == size:
+                yield entities, tuple(map(list, zip(*rows)))
+                entities, rows = [], []
+        if entities:
+            yield entities, tuple(map(list, zip(*rows)))
+
+    def __iter_entities(self) -> Iterator[tuple[int, T]]:
+        # The loop walks a copy, so processors may change the entities
+        # as they go; entities that stopped matching are skipped.
+        entities = self.__entities
+        component_types = self.__component_types
+        if self.__optional:
+            get = self.__storage.get_component
+            for entity in list(entities):
+                if entity in entities:
+                    yield entity, tuple(get(entity, t) for t in component_types)  # type: ignore
+            return
+        fetch = self.__fetch
+        for entity in list(entities):
+            if entity in entities:
+                yield entity, fetch(entity)  # type: ignore
+
+    def __iter_changes(self) -> Iterator[tuple[int, T]]:
+        last_run = self.last_run
+        self.last_run = self.__tracker.advance()
+        storage = self.__storage
+        for entity in self.__pending(last_run):
+            components: list[Any] = [
+                storage.get_component(entity, component_type)
+                for component_type in self.__component_types
+            ]
+            for index, log in self.__removed:
+                components[index] = log.removed[entity][1]
+            yield entity, tuple(components)  # type: ignore
+
+    def __pending(self, last_run: int) -> Iterator[int]:
+        selections = sorted(
+            (_select(term, log, last_run) for term, log in self.__change_terms),
+            key=len,
+        )
+        entities = self.__entities
+        matching = self.__matching
+        excluded = self.__excluded
+        has = self.__storage.has_component
+        for entity in selections[0]:
+            if matching and entity not in entities:
+                continue
+            if excluded and any(has(entity, t) for t in excluded):
+                continue
+            if all(entity in selection for selection in selections[1:]):
+                yield entity
+
+    def refresh(self) -> None:
+        """Matches the entities again from scratch."""
+        if self.__matching:
+            self.__entities = self.__storage.match_entities(
+                self.__required, self.__excluded, self.__groups
+            )
+
+    def on_component_added(self, entity: int, _: Component, /) -> None:
+        self.__update(entity)
+
+    def on_component_changed(self, entity: int, _: Component, /) -> None:
+        pass
+
+    def on_component_removed(self, entity: int, _: Component, /) -> None:
+        if self.__excluded or self.__groups:
+            self.__update(entity)
+        else:
+            self.__entities.discard(entity)
+
+    def __update(self, entity: int) -> None:
+        if not self.__matching:
+            return
+        has = self.__storage.has_component
+        if (
+            all(has(entity, t) for t in self.__required)
+            and not any(has(entity, t) for t in self.__excluded)
+            and all(any(has(entity, t) for t in group) for group in self.__groups)
+        ):
+            self.__entities.add(entity)
+        else:
+            self.__entities.discard(entity)
+
+
+def _select(term: ChangeTerm, log: ChangeLog, last_run: int) -> set[int]:
+    if isinstance(term, Removed):
+        return {e for e, (tick, _) in log.removed.items() if tick > last_run}
+    records = log.added if isinstance(term, Added) else log.changed
+    return {e for e, tick in records.items() if tick > last_run}
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any, TypeVar, overload
+
+R = TypeVar("R")
+D = TypeVar("D")
+
+
+class Resources:
+    """
+    The singletons of a system, such as a clock, a config or a random
+    generator, stored by type outside of the entities.
+
+    Lookups are a single dict access. Each resource has a version that
+    is bumped when it is inserted or marked as changed, which
+    `criteria.resource_changed` uses to run processors only after a change.
+    """
+
+    __slots__ = ("__values", "__versions")
+
+    def __init__(self) -> None:
+        self.__values: dict[type, Any] = {}
+        self.__versions: dict[type, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def __iter__(self) -> Iterator[type]:
+        return iter(self.__values)
+
+    def __contains__(self, resource_type: object) -> bool:
+        return resource_type in self.__values
+
+    def __getitem__(self, resource_type: type[R]) -> R:
+        return self.__values[resource_type]  # type: ignore
+
+    def insert(self, resource: Any, resource_type: type | None = None) -> None:
+        """Stores a resource under its type, or the given one,
+        replacing the previous resource of that type."""
+        if resource_type is None:
+            resource_type = type(resource)
+        elif not isinstance(resource, resource_type):
+            raise TypeError(f"{resource!r} is not a {resource_type.__name__}")
+        self.__values[resource_type] = resource
+        self.__versions[resource_type] = self.__versions.get(resource_type, 0) + 1
+
+    @overload
+    def get(self, resource_type: type[R]) -> R | None: ...
+
+    @overload
+    def get(self, resource_type: type[R], default: D) -> R | D: ...
+
+    def get(self, resource_type: type[R], default: Any = None) -> Any:
+        """Returns the resource of the given type, or the default."""
+        return self.__values.get(resource_type, default)
+
+    def get_or_insert(self, resource_type: type[R]) -> R:
+        """Returns the resource of the given type, creating it
+        with no arguments if there is none."""
+        resource = self.__values.get(resource_type)
+        if resource is None:
+            resource = resource_type()
+            self.insert(resource, resource_type)
+        return resource  # type: ignore
+
+    def remove(self, resource_type: type[R]) -> R:
+        """Removes the resource of the given type and returns it."""
+        resource = self.__values.pop(resource_type)
+        self.__versions[resource_type] += 1
+        return resource  # type: ignore
+
+    def mark_changed(self, resource_type: type) -> None:
+        """Reports that a resource was changed in place."""
+        if resource_type not in self.__values:
+            raise KeyError(resource_type)
+        self.__versions[resource_type] += 1
+
+    def version(self, resource_type: type) -> int:
+        """Returns the number of times a resource was inserted,
+        changed or removed."""
+        return self.__versions.get(resource_type, 0)
+
+    def clear(self) -> None:
+        """Removes all resources."""
+        for resource_type in self.__values:
+            self.__versions[resource_type] += 1
+        self.__values = {}
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from .system import System
+
+
+class TickStats(NamedTuple):
+    """
+    The counters of a scheduler since it started or was reset.
+
+    `lag` is how many seconds the last frame ended behind schedule.
+    """
+
+    ticks: int
+    frames: int
+    overruns: int
+    dropped: int
+    lag: float
+
+
+class Scheduler:  # noqa: R0902 # pylint: disable=R0902
+    """
+    Runs the updates of a system on a schedule, sleeping until
+    the next deadline instead of spinning.
+
+    With a fixed `timestep`, elapsed time is accumulated and consumed
+    one update per step, catching up at most `max_catch_up` steps a frame.
+    Steps beyond that are dropped rather than letting the loop fall
+    further behind. With `max_rate`, one update runs per frame,
+    at most `max_rate` times per second.
+
+    A frame whose work ends past its deadline is an overrun, and the
+    `on_overrun` callback receives how many seconds the loop is behind.
+
+    Args:
+        timestep (float | None): The seconds simulated by each update.
+        max_rate (float | None): The maximum number of updates per second.
+        max_catch_up (int): The maximum number of fixed steps per frame.
+        on_overrun (Callable[[float], object] | None): Called after an overrun.
+        clock (Callable[[], float]): Returns the current time in seconds.
+        sleep (Callable[[float], object]): Waits for the given seconds.
+    """
+
+    def __init__(  # noqa: R0913 # pylint: disable=R0913
+        self,
+        timestep: float | None = None,
+        max_rate: float | None = None,
+        max_catch_up: int = 5,
+        on_overrun: Callable[[float], object] | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], object] = time.sleep,
+    ) -> None:
+        if (timestep is None) == (max_rate is None):
+            raise ValueError("Use either a fixed timestep or a maximum rate")
+        interval = timestep if timestep is not None else 1 / max_rate  # type: ignore
+        if interval <= 0:
+            raise ValueError("The timestep and rate must be positive")
+        if max_catch_up < 1:
+            raise ValueError("At least one step must be caught up per frame")
+        self.__fixed = timestep is not None
+        self.__interval = interval
+        self.__max_catch_up = max_catch_up
+        self.__on_overrun = on_overrun
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__accumulator = 0.0
+        self.__stats = TickStats(0, 0, 0, 0, 0.0)
+
+    @property
+    def interval(self) -> float:
+        """The seconds between two updates."""
+        return self.__interval
+
+    @property
+    def alpha(self) -> float:
+        """The fraction of a fixed step accumulated but not yet run,
+        to interpolate between the last two states."""
+        return self.__accumulator / self.__interval if self.__fixed else 0.0
+
+    @property
+    def stats(self) -> TickStats:
+        """The counters of the scheduler."""
+        return self.__stats
+
+    def run(self, system: System) -> None:
+        """Updates the system until it stops."""
+        clock = self.__clock
+        interval = self.__interval
+        # Fixed steps are due at `origin + n * interval` rather than at an
+        # accumulated deadline, so rounding can not leave a step forever
+        # just short of due while the loop skips sleeping.
+        origin = clock() - self.__accumulator
+        steps = 0
+        deadline = origin + interval
+        while system.is_running:
+            if self.__fixed:
+                now = clock()
+                due = self.__due(origin, steps, now)
+                ticks = self.__step(system, due)
+                dropped = due - ticks
+                steps += due
+                self.__accumulator = now - (origin + steps * interval)
+                deadline = origin + (steps + 1) * interval
+            else:
+                system.update()
+                ticks, dropped = 1, 0
+            now = clock()
+            self.__finish(ticks, dropped, now - deadline)
+            if deadline > now and system.is_running:
+                self.__sleep(deadline - now)
+            if not self.__fixed:
+                # A late frame starts the next one at once, rather than bursting.
+                deadline = max(deadline, now) + interval
+
+    def reset(self) -> None:
+        """Clears the counters and the accumulated time."""
+        self.__accumulator = 0.0
+        self.__stats = TickStats(0, 0, 0, 0, 0.0)
+
+    def __due(self, origin: float, steps: int, now: float) -> int:
+        interval = self.__interval
+        due = max(int((now - origin) // interval) - steps, 0)
+        # The division may round across a deadline, so the deadlines decide.
+        while due and origin + (steps + due) * interval > now:
+            due -= 1
+        while origin + (steps + due + 1) * interval <= now:
+            due += 1
+        return due
+
+    def __step(self, system: System, due: int) -> int:
+        ticks = 0
+        while ticks < min(due, self.__max_catch_up):
+            system.update()
+            ticks += 1
+            if not system.is_running:
+                break
+        return ticks
+
+    def __finish(self, ticks: int, dropped: int, late: float) -> None:
+        stats = self.__stats
+        behind = max(late, 0.0) + dropped * self.__interval
+        overrun = behind > 0.0
+        self.__stats = TickStats(
+            stats.ticks + ticks,
+            stats.frames + 1,
+            stats.overruns + overrun,
+            stats.dropped + dropped,
+            behind,
+        )
+        if overrun and self.__on_overrun is not None:
+            self.__on_overrun(behind)
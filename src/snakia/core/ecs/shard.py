@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+from collections.abc import Iterable, Iterator
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from typing import TYPE_CHECKING, Any, Final
+
+from .columnar import ColumnarComponent
+from .component import Component
+from .delta import Delta, DeltaRecorder
+from .entity_pool import EntityPool
+from .processor import Processor
+from .storage import TableStorage
+from .system import System
+
+if TYPE_CHECKING:
+    from .storage.column_table import ColumnView
+    from .storage.shared_table import SharedTable
+
+SHARD_BITS: Final = 8
+SHARD_MASK: Final = (1 << SHARD_BITS) - 1
+
+
+def _run_shard(
+    connection: Connection,
+    tables: dict[type[ColumnarComponent], SharedTable],
+    processors: list[Processor],
+) -> None:
+    system = System(TableStorage(tables))
+    for processor in processors:
+        system.add_processor(processor)
+    recorder = DeltaRecorder(system)
+    while True:
+        changes: Delta | None = connection.recv()
+        if changes is None:
+            break
+        try:
+            system.apply_delta(changes)
+            recorder.clear()
+            system.update()
+            system.apply_pending()
+            buffer = io.BytesIO()
+            recorder.write(buffer)
+        except Exception as error:  # pylint: disable=W0718
+            connection.send(error)
+        else:
+            connection.send(buffer.getvalue())
+    connection.close()
+
+
+class ShardedSystem:
+    """
+    Splits the entities of a world between worker processes.
+
+    Each shard is a `System` in its own process that runs its own copy
+    of the processors on its entities, so processor code is unchanged.
+    The given columnar component types live in shared memory, which
+    `get_columns` reads without copying. Other components stay in the
+    process of their shard.
+
+    Entities created or deleted here are sent to the shards on the next
+    `update`, and the entities that processors create or delete are merged
+    back when it returns. Ids pack the shard into their low `SHARD_BITS`,
+    above which is the id of the entity in its shard, as processors see it.
+
+    Args:
+        processors (Iterable[Processor]): The processors, copied to each shard.
+        component_types (Iterable[type[ColumnarComponent]]): The component
+            types kept in shared memory.
+        shards (int | None): The number of worker processes.
+            Defaults to the number of CPUs.
+        capacity (int): The number of entity slots of each shard.
+        context (BaseContext | None): The multiprocessing context
+            used to start the workers.
+    """
+
+    def __init__(  # noqa: R0913 # pylint: disable=R0913
+        self,
+        processors: Iterable[Processor],
+        component_types: Iterable[type[ColumnarComponent]],
+        shards: int | None = None,
+        capacity: int = 1 << 16,
+        context: BaseContext | None = None,
+    ) -> None:
+        # numpy is an optional dependency, only needed for shared components.
+        # noqa: C0415 # pylint: disable=C0415
+        from .storage.shared_table import SharedTable
+
+        count = shards or os.cpu_count() or 1
+        if not 0 < count <= SHARD_MASK + 1:
+            raise ValueError(f"The number of shards must be in 1..{SHARD_MASK + 1}")
+        context = context or multiprocessing.get_context()
+        processors = list(processors)
+        component_types = tuple(component_types)
+        for component_type in component_types:
+            if not issubclass(component_type, ColumnarComponent):
+                raise TypeError(f"{component_type.__name__} is not a ColumnarComponent")
+        self.__capacity = capacity
+        self.__pools = [EntityPool() for _ in range(count)]
+        self.__changes = [Delta(0) for _ in range(count)]
+        self.__tables: list[dict[type[ColumnarComponent], SharedTable]] = []
+        self.__connections: list[Connection] = []
+        self.__processes: list[Any] = []
+        for _ in range(count):
+            tables = {t: SharedTable(t, capacity + 1) for t in component_types}
+            connection, child = context.Pipe()
+            process = context.Process(
+                target=_run_shard, args=(child, tables, processors), daemon=True
+            )
+            process.start()
+            child.close()
+            self.__tables.append(tables)
+            self.__connections.append(connection)
+            self.__processes.append(process)
+
+    def __enter__(self) -> ShardedSystem:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(pool) for pool in self.__pools)
+
+    @property
+    def shards(self) -> int:
+        """The number of shards."""
+        return len(self.__pools)
+
+    def create_entity(self, *components: Component, shard: int | None = None) -> int:
+        """Creates an entity in the given shard, or in the least loaded one.
+
+        The components are added on the next update.
+        """
+        pools = self.__pools
+        if shard is None:
+            shard = min(range(len(pools)), key=lambda index: len(pools[index]))
+        pool = pools[shard]
+        entity = pool.create()
+        if EntityPool.index(entity) > self.__capacity:
+            pool.release(entity)
+            raise IndexError(f"Shard {shard} holds {self.__capacity} entities")
+        changes = self.__changes[shard]
+        changes.created.append(entity)
+        for component in components:
+            entities, column = changes.changed.setdefault(type(component), ([], []))
+            entities.append(entity)
+            column.append(component)
+        return (entity << SHARD_BITS) | shard
+
+    def delete_entity(self, entity: int) -> None:
+        """Deletes an entity on the next update."""
+        shard, local = entity & SHARD_MASK, entity >> SHARD_BITS
+        self.__pools[shard].release(local)
+        self.__changes[shard].deleted.append(local)
+
+    def entity_exists(self, entity: int) -> bool:
+        """Returns True if the entity exists."""
+        shard = entity & SHARD_MASK
+        return shard < len(self.__pools) and self.__pools[shard].is_alive(
+            entity >> SHARD_BITS
+        )
+
+    def update(self) -> None:
+        """Runs the processors of every shard once, in parallel.
+
+        Returns when all shards are done and their changes are merged.
+        """
+        changes = self.__changes
+        self.__changes = [Delta(0) for _ in changes]
+        for connection, delta in zip(self.__connections, changes):
+            connection.send(delta)
+        errors: list[BaseException] = []
+        for connection, pool in zip(self.__connections, self.__pools):
+            reply = connection.recv()
+            if isinstance(reply, BaseException):
+                errors.append(reply)
+                continue
+            delta = Delta.read(io.BytesIO(reply))
+            for entity in delta.deleted:
+                if pool.is_alive(entity):
+                    pool.release(entity)
+            for entity in delta.created:
+                pool.claim(entity)
+        if errors:
+            raise errors[0]
+
+    def get_columns(
+        self, *component_types: type[ColumnarComponent]
+    ) -> Iterator[tuple[tuple[int, ...], tuple[ColumnView, ...]]]:
+        """Returns column views of all entities with the given shared components.
+
+        Yields blocks of entities and a view per component, whose fields
+        are NumPy arrays in shared memory. Only valid between updates.
+        """
+        # noqa: C0415 # pylint: disable=C0415
+        from .storage.record_table import query_tables
+
+        for shard, tables in enumerate(self.__tables):
+            try:
+                selected = [
+                    tables[component_type] for component_type in component_types
+                ]
+            except KeyError as error:
+                raise TypeError(f"{error.args[0].__name__} is not shared") from None
+            for entities, views in query_tables(selected):
+                yield tuple(
+                    (entity << SHARD_BITS) | shard for entity in entities
+                ), views
+
+    def close(self) -> None:
+        """Stops the workers and frees the shared memory."""
+        for connection in self.__connections:
+            connection.send(None)
+        for process, connection in zip(self.__processes, self.__connections):
+            process.join()
+            connection.close()
+        for tables in self.__tables:
+            for table in tables.values():
+                table.close()
+        self.__connections = []
+        self.__processes = []
+        self.__tables = []
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from functools import cache
+from importlib import import_module
+from typing import Any, BinaryIO, Final
+
+from pydantic import TypeAdapter
+
+from snakia.field import StrField
+
+from .columnar import ColumnarComponent
+from .component import Component
+from .entity_pool import INDEX_BITS, EntityPool
+from .fast_component import FastComponent
+from .storage import Storage
+from .storage.storage import to_components
+from .tag import Tag, is_tag
+
+MAGIC: Final = b"SNKW"
+VERSION: Final = 1
+
+_POOL: Final = b"P"
+_BLOCK: Final = b"B"
+_END: Final = b"E"
+
+_LITTLE: Final = 0
+_BIG: Final = 1
+
+_MODEL: Final = 0
+_COLUMNS: Final = 1
+_TAG: Final = 2
+
+_TYPECODES: Final = {"bool": "B", "int64": "q", "float64": "d"}
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U64 = struct.Struct("<Q")
+
+_NAME = StrField("")
+
+Block = tuple[list[int], dict[type[Component], Any]]
+
+
+@cache
+def _adapter(component_type: type[Any]) -> TypeAdapter[list[Any]]:
+    return TypeAdapter(list[component_type])  # type: ignore[valid-type]
+
+
+def _type_name(component_type: type[Component]) -> str:
+    if "<locals>" in component_type.__qualname__:
+        raise ValueError(
+            f"{component_type.__qualname__} is defined in a function"
+            " and could not be found when reading"
+        )
+    return f"{component_type.__module__}:{component_type.__qualname__}"
+
+
+@cache
+def _resolve(name: str) -> type[Component]:
+    module, _, qualname = name.partition(":")
+    obj: Any = import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    if not isinstance(obj, type) or not issubclass(
+        obj, (Component, FastComponent, Tag)
+    ):
+        raise TypeError(f"{name} is not a component type")
+    return obj
+
+
+class _Writer:
+    __slots__ = ("__file",)
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.__file = file
+
+    def raw(self, data: bytes | memoryview) -> None:
+        self.__file.write(data)
+
+    def u8(self, value: int) -> None:
+        self.__file.write(_U8.pack(value))
+
+    def u16(self, value: int) -> None:
+        self.__file.write(_U16.pack(value))
+
+    def u64(self, value: int) -> None:
+        self.__file.write(_U64.pack(value))
+
+    def blob(self, data: bytes | memoryview) -> None:
+        self.__file.write(_U64.pack(memoryview(data).nbytes))
+        self.__file.write(data)
+
+    def array(self, values: array[Any]) -> None:
+        self.blob(memoryview(values))
+
+    def name(self, name: str) -> None:
+        data = _NAME.serialize(name)
+        self.u16(len(data))
+        self.__file.write(data)
+
+
+class _Reader:
+    __slots__ = ("__file",)
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.__file = file
+
+    def raw(self, size: int) -> bytes:
+        data = self.__file.read(size)
+        if len(data) != size:
+            raise EOFError("The snapshot is truncated")
+        return data
+
+    def u8(self) -> int:
+        return _U8.unpack(self.raw(1))[0]  # type: ignore
+
+    def u16(self) -> int:
+        return _U16.unpack(self.raw(2))[0]  # type: ignore
+
+    def u64(self) -> int:
+        return _U64.unpack(self.raw(8))[0]  # type: ignore
+
+    def blob(self) -> bytes:
+        return self.raw(_U64.unpack(self.raw(8))[0])
+
+    def array(self, typecode: str) -> array[Any]:
+        values = array(typecode)
+        values.frombytes(self.blob())
+        return values
+
+    def name(self) -> str:
+        return _NAME.deserialize(self.raw(self.u16()))
+
+
+def save(
+    file: BinaryIO, entities: EntityPool, storage: Storage, chunk_size: int
+) -> None:
+    """Writes a snapshot of the entities and the storage to a binary file.
+
+    Blocks of at most `chunk_size` entities are written one at a time.
+    Numbers are stored in the native byte order of the machine.
+    """
+    writer = _Writer(file)
+    _write_header(writer, MAGIC)
+    generations, alive, free = entities.dump()
+    writer.raw(_POOL)
+    writer.array(generations)
+    writer.blob(alive)
+    writer.array(free)
+    for block, columns in storage.blocks(chunk_size):
+        writer.raw(_BLOCK)
+        writer.array(array("Q", block))
+        writer.u16(len(columns))
+        for component_type, column in columns.items():
+            writer.name(_type_name(component_type))
+            _write_column(writer, component_type, column)
+    writer.raw(_END)
+
+
+def read(file: BinaryIO) -> tuple[EntityPool, Iterable[Block]]:
+    """Reads and validates a whole snapshot written by `save`.
+
+    Returns the entity pool and the blocks of components, for `fill`.
+    A seekable file is validated one block at a time, and its blocks are
+    decoded again as they are filled. The blocks of other files are
+    kept in memory.
+    """
+    reader = _Reader(file)
+    _read_header(reader, MAGIC)
+    if reader.raw(1) != _POOL:
+        raise ValueError("The snapshot has no entity pool")
+    entities = EntityPool()
+    entities.load(reader.array("Q"), reader.blob(), reader.array("I"))
+    if not file.seekable():
+        return entities, list(_read_blocks(reader))
+    start = file.tell()
+    for _ in _read_blocks(reader):
+        pass
+    return entities, _reread_blocks(file, start)
+
+
+def _reread_blocks(file: BinaryIO, start: int) -> Iterator[Block]:
+    file.seek(start)
+    yield from _read_blocks(_Reader(file))
+
+
+def fill(storage: Storage, entities: EntityPool, blocks: Iterable[Block]) -> None:
+    """Adds the blocks of a snapshot read by `read` to an empty storage."""
+    for block, columns in blocks:
+        if block and storage.has_entity(block[0]):
+            rows = to_components(columns, len(block))
+            for index, entity in enumerate(block):
+                for column in rows.values():
+                    storage.add_component(entity, column[index])
+        else:
+            storage.add_entities(block, columns)
+    for entity in _alive(entities):
+        if not storage.has_entity(entity):
+            storage.add_entity(entity, ())
+
+
+def _write_header(writer: _Writer, magic: bytes) -> None:
+    writer.raw(magic)
+    writer.u8(VERSION)
+    writer.u8(_LITTLE if sys.byteorder == "little" else _BIG)
+
+
+def _read_header(reader: _Reader, magic: bytes) -> None:
+    if reader.raw(len(magic)) != magic:
+        raise ValueError("Not a snapshot")
+    version = reader.u8()
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    if reader.u8() != (_LITTLE if sys.byteorder == "little" else _BIG):
+        raise ValueError("The snapshot was written with another byte order")
+
+
+def _write_column(
+    writer: _Writer, component_type: type[Component], column: Sequence[Any]
+) -> None:
+    if is_tag(component_type):
+        writer.u8(_TAG)
+        return
+    if issubclass(component_type, ColumnarComponent):
+        writer.u8(_COLUMNS)
+        for name, dtype in component_type.__columns__.items():
+            if isinstance(column, Sequence):
+                writer.array(
+                    array(_TYPECODES[dtype], [getattr(c, name) for c in column])
+                )
+            else:
+                # Column views are written from their NumPy buffers directly.
+                writer.blob(memoryview(getattr(column, name)).cast("B"))
+        return
+    writer.u8(_MODEL)
+    writer.blob(_adapter(component_type).dump_json(list(column)))
+
+
+def _read_blocks(reader: _Reader) -> Iterator[Block]:
+    while True:
+        record = reader.raw(1)
+        if record == _END:
+            return
+        if record != _BLOCK:
+            raise ValueError(f"Unknown snapshot record {record!r}")
+        block = reader.array("Q").tolist()
+        columns: dict[type[Component], Any] = {}
+        for _ in range(reader.u16()):
+            component_type = _resolve(reader.name())
+            columns[component_type] = _read_column(reader, component_type, len(block))
+        yield block, columns
+
+
+def _read_column(reader: _Reader, component_type: type[Component], count: int) -> Any:
+    kind = reader.u8()
+    if kind == _TAG:
+        return [component_type()] * count
+    if kind == _COLUMNS:
+        return {
+            name: reader.array(_TYPECODES[dtype])
+            for name, dtype in component_type.__columns__.items()  # type: ignore
+        }
+    return _adapter(component_type).validate_json(reader.blob())
+
+
+def _alive(entities: EntityPool) -> Iterator[int]:
+    generations, alive, _ = entities.dump()
+    for index, flag in enumerate(alive):
+        if flag:
+            yield (generations[index] << INDEX_BITS) | index
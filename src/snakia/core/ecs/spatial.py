@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from math import floor
+from typing import TYPE_CHECKING
+
+from .component import Component
+
+if TYPE_CHECKING:
+    from .system import System
+
+
+class SpatialIndex:
+    """
+    A uniform grid of the entities of a system, by the position
+    stored in a component.
+
+    The grid follows the notifications of the system: positions changed
+    in place must be reported with `System.mark_changed`, or picked up
+    with `rebuild`. Queries visit only the cells that overlap the area,
+    so their cost grows with the number of entities near it.
+
+    Args:
+        system (System): The system to index.
+        component_type (type[Component]): The component holding the position.
+        cell_size (float): The size of the grid cells. Queries are fastest
+            when it is close to the usual query radius.
+        fields (tuple[str, str]): The names of the coordinate fields.
+    """
+
+    def __init__(
+        self,
+        system: System,
+        component_type: type[Component],
+        cell_size: float,
+        fields: tuple[str, str] = ("x", "y"),
+    ) -> None:
+        if cell_size <= 0:
+            raise ValueError("The cell size must be positive")
+        self.__system = system
+        self.__component_type = component_type
+        self.__cell_size = cell_size
+        self.__fields = fields
+        self.__cells: dict[tuple[int, int], dict[int, tuple[float, float]]] = {}
+        self.__entities: dict[int, tuple[int, int]] = {}
+        system.observe(component_type, self)
+        self.rebuild()
+
+    def __len__(self) -> int:
+        return len(self.__entities)
+
+    def __contains__(self, entity: object) -> bool:
+        return entity in self.__entities
+
+    @property
+    def cell_size(self) -> float:
+        """The size of the grid cells."""
+        return self.__cell_size
+
+    def position(self, entity: int) -> tuple[float, float] | None:
+        """Returns the indexed position of an entity."""
+        cell = self.__entities.get(entity)
+        if cell is None:
+            return None
+        return self.__cells[cell][entity]
+
+    def query_radius(self, x: float, y: float, radius: float) -> list[int]:
+        """Returns the entities within the given distance of a point."""
+        limit = radius * radius
+        return [
+            entity
+            for entity, (px, py) in self.__candidates(
+                x - radius, y - radius, x + radius, y + radius
+            )
+            if (px - x) * (px - x) + (py - y) * (py - y) <= limit
+        ]
+
+    def query_rect(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> list[int]:
+        """Returns the entities inside the given rectangle, edges included."""
+        return [
+            entity
+            for entity, (px, py) in self.__candidates(min_x, min_y, max_x, max_y)
+            if min_x <= px <= max_x and min_y <= py <= max_y
+        ]
+
+    def rebuild(self) -> None:
+        """Indexes the positions of all entities again."""
+        self.__cells = {}
+        self.__entities = {}
+        for entity, (component,) in self.__system.get_components(self.__component_type):
+            self.__insert(entity, component)
+
+    def close(self) -> None:
+        """Stops following the system."""
+        self.__system.unobserve(self.__component_type, self)
+
+    def on_component_added(self, entity: int, component: Component, /) -> None:
+        self.__discard(entity)
+        self.__insert(entity, component)
+
+    def on_component_changed(self, entity: int, component: Component, /) -> None:
+        self.on_component_added(entity, component)
+
+    def on_component_removed(self, entity: int, _: Component, /) -> None:
+        self.__discard(entity)
+
+    def __insert(self, entity: int, component: Component) -> None:
+        x_field, y_field = self.__fields
+        x = float(getattr(component, x_field))
+        y = float(getattr(component, y_field))
+        cell = (floor(x / self.__cell_size), floor(y / self.__cell_size))
+        self.__cells.setdefault(cell, {})[entity] = (x, y)
+        self.__entities[entity] = cell
+
+    def __discard(self, entity: int) -> None:
+        cell = self.__entities.pop(entity, None)
+        if cell is None:
+            return
+        entities = self.__cells[cell]
+        del entities[entity]
+        if not entities:
+            del self.__cells[cell]
+
+    def __candidates(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> list[tuple[int, tuple[float, float]]]:
+        size = self.__cell_size
+        cells = self.__cells
+        first_x, last_x = floor(min_x / size), floor(max_x / size)
+        first_y, last_y = floor(min_y / size), floor(max_y / size)
+        if (last_x - first_x + 1) * (last_y - first_y + 1) > len(cells):
+            # Areas larger than the occupied cells scan the cells instead.
+            return [
+                item
+                for (cx, cy), entities in cells.items()
+                if first_x <= cx <= last_x and first_y <= cy <= last_y
+                for item in entities.items()
+            ]
+        candidates: list[tuple[int, tuple[float, float]]] = []
+        for cx in range(first_x, last_x + 1):
+            for cy in range(first_y, last_y + 1):
+                entities = cells.get((cx, cy))
+                if entities:
+                    candidates.extend(entities.items())
+        return candidates
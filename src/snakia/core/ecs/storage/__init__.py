@@ -0,0 +1,17 @@
+from .archetype import Archetype
+from .archetype_storage import ArchetypeStorage
+from .dict_storage import DictStorage
+from .mapped_storage import MappedStorage
+from .sparse_set import SparseSet
+from .storage import Storage
+from .table_storage import TableStorage
+
+__all__ = [
+    "Archetype",
+    "ArchetypeStorage",
+    "DictStorage",
+    "MappedStorage",
+    "SparseSet",
+    "Storage",
+    "TableStorage",
+]
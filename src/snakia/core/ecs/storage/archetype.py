@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Union
+
+from ..columnar import ColumnarComponent
+from ..component import Component
+from ..tag import is_tag
+
+if TYPE_CHECKING:
+    from .column_table import ColumnTable
+
+Column = Union[list[Component], "ColumnTable", "TagColumn"]
+
+
+class TagColumn:
+    """
+    The column of a tag type, which stores nothing per row.
+    """
+
+    __slots__ = ("instance",)
+
+    def __init__(self, tag_type: type[Component]) -> None:
+        self.instance = tag_type()
+
+    def __getitem__(self, row: int) -> Component:
+        return self.instance
+
+    def __setitem__(self, row: int, component: Component) -> None:
+        pass
+
+    def append(self, component: Component) -> None:
+        """Does nothing, as tags have no data."""
+
+    def extend(self, components: Any, count: int) -> None:
+        """Does nothing, as tags have no data."""
+
+    def swap_remove(self, row: int) -> None:
+        """Does nothing, as tags have no data."""
+
+    def compact(self, start: int, rows: Sequence[int]) -> None:
+        """Does nothing, as tags have no data."""
+
+
+def _create_column(component_type: type[Component]) -> Column:
+    if is_tag(component_type):
+        return TagColumn(component_type)
+    if issubclass(component_type, ColumnarComponent):
+        # numpy is an optional dependency, only needed for columnar components.
+        # noqa: C0415 # pylint: disable=C0415
+        from .column_table import ColumnTable
+
+        return ColumnTable(component_type)
+    return []
+
+
+class Archetype:
+    """
+    A table of all entities that have exactly the same set of component types.
+
+    Rows are packed: removing an entity moves the last row into its place.
+    """
+
+    __slots__ = ("types", "entities", "columns", "add_edges", "remove_edges")
+
+    def __init__(self, types: frozenset[type[Component]]) -> None:
+        self.types: frozenset[type[Component]] = types
+        self.entities: list[int] = []
+        self.columns: dict[type[Component], Column] = {
+            component_type: _create_column(component_type) for component_type in types
+        }
+        self.add_edges: dict[type[Component], Archetype] = {}
+        self.remove_edges: dict[type[Component], Archetype] = {}
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def append(self, entity: int, components: dict[type[Component], Component]) -> int:
+        """Appends a row and returns its index."""
+        self.entities.append(entity)
+        for component_type, column in self.columns.items():
+            column.append(components[component_type])  # type: ignore
+        return len(self.entities) - 1
+
+    def extend(
+        self, entities: Sequence[int], columns: Mapping[type[Component], Any]
+    ) -> None:
+        """Appends a row per entity from per-type columns."""
+        count = len(entities)
+        self.entities.extend(entities)
+        for component_type, column in self.columns.items():
+            values = columns[component_type]
+            if isinstance(column, list):
+                if len(values) != count:
+                    raise ValueError(f"Expected {count} {component_type.__name__}")
+                column.extend(values)
+            else:
+                column.extend(values, count)
+
+    def row(self, row: int) -> dict[type[Component], Component]:
+        """Returns the components of the given row."""
+        return {
+            component_type: column[row]
+            for component_type, column in self.columns.items()
+        }
+
+    def slice(
+        self, component_type: type[Component], start: int, stop: int
+    ) -> Sequence[Any]:
+        """Returns the components of a type in a range of rows.
+
+        Columnar components are returned as a column view,
+        and a type the archetype does not have as None for every row.
+        """
+        column = self.columns.get(component_type)
+        if column is None:
+            return [None] * (stop - start)
+        if isinstance(column, list):
+            return column[start:stop]
+        if isinstance(column, TagColumn):
+            return [column.instance] * (stop - start)
+        return column.view(start, stop)  # type: ignore
+
+    def remove_rows(self, rows: Iterable[int]) -> Iterable[int]:
+        """Removes several rows at once.
+
+        A few rows are filled with the last rows, otherwise the rows after
+        the first removed one are moved up in a single pass.
+
+        Returns:
+            Iterable[int]: The rows that may now hold another entity,
+                some of which may be past the end.
+        """
+        rows = sorted(rows, reverse=True)
+        if not rows:
+            return ()
+        first = rows[-1]
+        entities = self.entities
+        if len(rows) * 16 < len(entities) - first:
+            # Removing the last rows first only ever moves kept rows.
+            return [row for row in rows if self.swap_remove(row) is not None]
+        removed = set(rows)
+        kept = [row for row in range(first, len(entities)) if row not in removed]
+        entities[first:] = [entities[row] for row in kept]
+        for column in self.columns.values():
+            if isinstance(column, list):
+                column[first:] = [column[row] for row in kept]
+            else:
+                column.compact(first, kept)
+        return range(first, len(entities))
+
+    def swap_remove(self, row: int) -> int | None:
+        """Removes a row by moving the last row into its place.
+
+        Returns:
+            int | None: The entity that was moved into the row, if any.
+        """
+        last = len(self.entities) - 1
+        moved = None
+        if row != last:
+            moved = self.entities[row] = self.entities[last]
+        self.entities.pop()
+        for column in self.columns.values():
+            if isinstance(column, list):
+                if row != last:
+                    column[row] = column[last]
+                column.pop()
+            else:
+                column.swap_remove(row)
+        return moved
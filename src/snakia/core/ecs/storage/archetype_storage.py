@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from functools import partial
+from itertools import chain, repeat
+from typing import TYPE_CHECKING, Any
+
+from ..columnar import ColumnarComponent, write_through
+from ..component import Component
+from .archetype import Archetype
+from .sparse_set import SparseSet, is_sparse
+from .storage import Storage, to_components
+
+if TYPE_CHECKING:
+    from .column_table import ColumnTable, ColumnView
+
+
+class ArchetypeStorage(Storage):  # noqa: R0904 # pylint: disable=R0904
+    """
+    A storage that groups entities with the same set of component types
+    into archetype tables.
+
+    Queries only walk the archetypes that contain every requested type,
+    so their cost follows the number of rows they return.
+
+    Component types declared with `__sparse__ = True` are kept out of
+    the archetypes in sparse sets, so adding and removing them never
+    moves the entity between tables. Queries can mix both kinds.
+
+    Columnar components read per entity are copies whose field
+    assignments are written back to the row of the entity.
+    """
+
+    __archetypes: dict[frozenset[type[Component]], Archetype]
+    __archetypes_by_type: dict[type[Component], list[Archetype]]
+    __locations: dict[int, tuple[Archetype, int]]
+    __matches: dict[frozenset[type[Component]], list[Archetype]]
+    __sparse: dict[type[Component], SparseSet]
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def add_entity(self, entity: int, components: Iterable[Component]) -> None:
+        location = self.__locations.get(entity)
+        if location is not None:
+            for component in components:
+                if not self.has_component(entity, type(component)):
+                    self.add_component(entity, component)
+            return
+        components_dict: dict[type[Component], Component] = {}
+        for component in components:
+            components_dict.setdefault(type(component), component)
+        dense: dict[type[Component], Component] = {}
+        for component_type, component in components_dict.items():
+            if is_sparse(component_type):
+                self.__get_sparse(component_type).add(entity, component)
+            else:
+                dense[component_type] = component
+        archetype = self.__get_archetype(frozenset(dense))
+        self.__locations[entity] = (archetype, archetype.append(entity, dense))
+
+    def add_entities(
+        self, entities: Sequence[int], columns: Mapping[type[Component], Any]
+    ) -> None:
+        sparse_types = [t for t in columns if is_sparse(t)]
+        if sparse_types:
+            rows = to_components({t: columns[t] for t in sparse_types}, len(entities))
+            for component_type, components in rows.items():
+                sparse_set = self.__get_sparse(component_type)
+                for entity, component in zip(entities, components):
+                    sparse_set.add(entity, component)
+            columns = {t: c for t, c in columns.items() if not is_sparse(t)}
+        archetype = self.__get_archetype(frozenset(columns))
+        start = len(archetype)
+        archetype.extend(entities, columns)
+        self.__locations.update(
+            zip(entities, zip(repeat(archetype), range(start, len(archetype))))
+        )
+
+    def remove_entity(self, entity: int) -> None:
+        archetype, row = self.__locations.pop(entity)
+        self.__remove_row(archetype, row)
+        for sparse_set in self.__sparse.values():
+            if entity in sparse_set:
+                sparse_set.remove(entity)
+
+    def remove_entities(self, entities: Iterable[int]) -> None:
+        entities = list(entities)
+        locations = self.__locations
+        rows: dict[Archetype, list[int]] = defaultdict(list)
+        for entity in entities:
+            archetype, row = locations.pop(entity)
+            rows[archetype].append(row)
+        for archetype, removed in rows.items():
+            moved = archetype.remove_rows(removed)
+            archetype_entities = archetype.entities
+            for row in moved:
+                if row < len(archetype_entities):
+                    locations[archetype_entities[row]] = (archetype, row)
+        for sparse_set in self.__sparse.values():
+            for entity in entities:
+                if entity in sparse_set:
+                    sparse_set.remove(entity)
+
+    def has_entity(self, entity: int) -> bool:
+        return entity in self.__locations
+
+    def entities(self) -> Iterator[int]:
+        return iter(list(self.__locations))
+
+    def add_component(self, entity: int, component: Component) -> None:
+        component_type = type(component)
+        location = self.__locations.get(entity)
+        if location is None:
+            self.add_entity(entity, (component,))
+            return
+        if is_sparse(component_type):
+            self.__get_sparse(component_type).add(entity, component)
+            return
+        archetype, row = location
+        if component_type in archetype.types:
+            archetype.columns[component_type][row] = component
+            return
+        target = archetype.add_edges.get(component_type)
+        if target is None:
+            target = self.__get_archetype(archetype.types | {component_type})
+            archetype.add_edges[component_type] = target
+        components = archetype.row(row)
+        components[component_type] = component
+        self.__remove_row(archetype, row)
+        self.__locations[entity] = (target, target.append(entity, components))
+
+    def remove_component(
+        self, entity: int, component_type: type[Component]
+    ) -> Component:
+        archetype, row = self.__locations[entity]
+        if is_sparse(component_type):
+            sparse_set = self.__sparse.get(component_type)
+            if sparse_set is None or entity not in sparse_set:
+                raise KeyError(component_type)
+            return sparse_set.remove(entity)
+        if component_type not in archetype.types:
+            raise KeyError(component_type)
+        target = archetype.remove_edges.get(component_type)
+        if target is None:
+            target = self.__get_archetype(archetype.types - {component_type})
+            archetype.remove_edges[component_type] = target
+        components = archetype.row(row)
+        component = components.pop(component_type)
+        self.__remove_row(archetype, row)
+        self.__locations[entity] = (target, target.append(entity, components))
+        return component
+
+    def get_component(
+        self, entity: int, component_type: type[Component], default: Any = None
+    ) -> Any:
+        location = self.__locations.get(entity)
+        if location is None:
+            return default
+        sparse_set = self.__sparse.get(component_type)
+        if sparse_set is not None:
+            return sparse_set.get(entity, default)
+        archetype, row = location
+        column = archetype.columns.get(component_type)
+        if column is None:
+            return default
+        if issubclass(component_type, ColumnarComponent):
+            return self.__write_through(entity, column[row])
+        return column[row]
+
+    def has_component(self, entity: int, component_type: type[Component]) -> bool:
+        sparse_set = self.__sparse.get(component_type)
+        if sparse_set is not None:
+            return entity in sparse_set
+        location = self.__locations.get(entity)
+        return location is not None and component_type in location[0].types
+
+    def get_entity(self, entity: int) -> dict[type[Component], Component]:
+        location = self.__locations.get(entity)
+        if location is None:
+            return {}
+        archetype, row = location
+        components = archetype.row(row)
+        for component in components.values():
+            if isinstance(component, ColumnarComponent):
+                self.__write_through(entity, component)
+        for component_type, sparse_set in self.__sparse.items():
+            component = sparse_set.get(entity)
+            if component is not None:
+                components[component_type] = component
+        return components
+
+    def fetch(
+        self, entity: int, component_types: tuple[type[Component], ...]
+    ) -> tuple[Component, ...]:
+        components = self.__fetch(entity, component_types)
+        for component in components:
+            if isinstance(component, ColumnarComponent):
+                self.__write_through(entity, component)
+        return components
+
+    def fetcher(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Callable[[int], tuple[Component, ...]]:
+        fetch = self.__fetch
+        if not any(issubclass(t, ColumnarComponent) for t in component_types):
+            return lambda entity: fetch(entity, component_types)
+        return lambda entity: self.fetch(entity, component_types)
+
+    def __fetch(
+        self, entity: int, component_types: tuple[type[Component], ...]
+    ) -> tuple[Component, ...]:
+        archetype, row = self.__locations[entity]
+        columns = archetype.columns
+        if not self.__sparse:
+            return tuple(
+                columns[component_type][row] for component_type in component_types
+            )
+        sparse = self.__sparse
+        return tuple(
+            (
+                sparse[component_type].get(entity)
+                if component_type in sparse
+                else columns[component_type][row]
+            )
+            for component_type in component_types
+        )
+
+    def query(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Iterator[tuple[int, tuple[Component, ...]]]:
+        if self.__sparse and any(map(is_sparse, component_types)):
+            yield from self.__query_mixed(component_types)
+            return
+        for archetype in self.get_archetypes(component_types):
+            entities = archetype.entities
+            columns = [
+                archetype.columns[component_type] for component_type in component_types
+            ]
+            columnar = any(
+                issubclass(component_type, ColumnarComponent)
+                for component_type in component_types
+            )
+            # Walking backwards keeps the loop valid when the current row
+            # leaves the archetype: only visited rows are moved into its place.
+            for row in range(len(entities) - 1, -1, -1):
+                if row >= len(entities):
+                    continue
+                entity = entities[row]
+                components = tuple(column[row] for column in columns)
+                if columnar:
+                    for component in components:
+                        if isinstance(component, ColumnarComponent):
+                            self.__write_through(entity, component)
+                yield entity, components
+
+    def iter_component(
+        self, component_type: type[Component]
+    ) -> Iterator[tuple[int, Component]]:
+        sparse_set = self.__sparse.get(component_type)
+        if sparse_set is not None:
+            yield from zip(list(sparse_set.entities), list(sparse_set.components))
+            return
+        if is_sparse(component_type):
+            return
+        columnar = issubclass(component_type, ColumnarComponent)
+        for archetype in self.get_archetypes((component_type,)):
+            entities = archetype.entities
+            column = archetype.columns[component_type]
+            for row in range(len(entities) - 1, -1, -1):
+                if row >= len(entities):
+                    continue
+                if columnar:
+                    entity = entities[row]
+                    yield entity, self.__write_through(entity, column[row])
+                else:
+                    yield entities[row], column[row]
+
+    def query_columns(
+        self, component_types: tuple[type[ColumnarComponent], ...]
+    ) -> Iterator[tuple[tuple[int, ...], tuple[ColumnView, ...]]]:
+        """Returns the entities and column views of every matching archetype."""
+        for archetype in self.get_archetypes(component_types):
+            columns: list[ColumnTable] = [
+                archetype.columns[component_type]  # type: ignore
+                for component_type in component_types
+            ]
+            yield tuple(archetype.entities), tuple(column.view() for column in columns)
+
+    def query_chunks(
+        self,
+        component_types: tuple[type[Component], ...],
+        size: int,
+        required: Iterable[type[Component]],
+        excluded: Iterable[type[Component]] = (),
+        any_of: Iterable[Iterable[type[Component]]] = (),
+    ) -> Iterator[tuple[list[int], tuple[Sequence[Any], ...]]]:
+        """Yields blocks of rows of the archetypes that match, as in `match_entities`.
+
+        Each block has at most `size` entities and a slice of the column of
+        every type: a list of components, a column view of a columnar
+        component, or None for every row if the archetype lacks the type.
+        Sparse types are not supported.
+        """
+        excluded = frozenset(excluded)
+        groups = [frozenset(group) for group in any_of]
+        for archetype in self.get_archetypes(required):
+            types = archetype.types
+            if not types.isdisjoint(excluded) or any(
+                types.isdisjoint(group) for group in groups
+            ):
+                continue
+            count = len(archetype)
+            for start in range(0, count, size):
+                stop = min(start + size, count)
+                yield archetype.entities[start:stop], tuple(
+                    archetype.slice(component_type, start, stop)
+                    for component_type in component_types
+                )
+
+    def get_archetypes(
+        self, component_types: Iterable[type[Component]]
+    ) -> list[Archetype]:
+        """Returns the non-empty archetypes that contain all the given types."""
+        key = frozenset(component_types)
+        matches = self.__matches.get(key)
+        if matches is None:
+            matches = self.__match(key)
+            self.__matches[key] = matches
+        return [archetype for archetype in matches if archetype.entities]
+
+    def blocks(
+        self, size: int
+    ) -> Iterator[tuple[list[int], dict[type[Component], Sequence[Any]]]]:
+        for archetype in list(self.__archetypes.values()):
+            count = len(archetype)
+            for start in range(0, count, size):
+                stop = min(start + size, count)
+                yield archetype.entities[start:stop], {
+                    component_type: archetype.slice(component_type, start, stop)
+                    for component_type in archetype.types
+                }
+        for component_type, sparse_set in list(self.__sparse.items()):
+            for start in range(0, len(sparse_set), size):
+                stop = start + size
+                yield sparse_set.entities[start:stop], {
+                    component_type: sparse_set.components[start:stop]
+                }
+
+    def match_entities(
+        self,
+        required: Iterable[type[Component]],
+        excluded: Iterable[type[Component]] = (),
+        any_of: Iterable[Iterable[type[Component]]] = (),
+    ) -> set[int]:
+        required = tuple(required)
+        excluded = frozenset(excluded)
+        groups = [frozenset(group) for group in any_of]
+        if not required and not groups:
+            raise ValueError("Nothing to match entities on")
+        if self.__sparse and any(map(is_sparse, chain(required, excluded, *groups))):
+            return super().match_entities(required, excluded, groups)
+        entities: set[int] = set()
+        for archetype in self.get_archetypes(required):
+            types = archetype.types
+            if types.isdisjoint(excluded) and not any(
+                types.isdisjoint(group) for group in groups
+            ):
+                entities.update(archetype.entities)
+        return entities
+
+    def clear(self) -> None:
+        self.__archetypes = {}
+        self.__archetypes_by_type = defaultdict(list)
+        self.__locations = {}
+        self.__matches = {}
+        self.__sparse = {}
+
+    def __query_mixed(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Iterator[tuple[int, tuple[Component, ...]]]:
+        dense_types = frozenset(t for t in component_types if not is_sparse(t))
+        sparse_sets: list[SparseSet] = []
+        for component_type in component_types:
+            if is_sparse(component_type):
+                sparse_set = self.__sparse.get(component_type)
+                if sparse_set is None:
+                    return
+                sparse_sets.append(sparse_set)
+        driver = min(sparse_sets, key=len)
+        archetypes = self.get_archetypes(dense_types) if dense_types else None
+        if archetypes is not None and sum(map(len, archetypes)) < len(driver):
+            candidates = [
+                entity for archetype in archetypes for entity in archetype.entities
+            ]
+        else:
+            candidates = list(driver.entities)
+        # The candidates are copied, so components may be added or removed
+        # while iterating; rows that no longer match are skipped.
+        for entity in reversed(candidates):
+            location = self.__locations.get(entity)
+            if location is None or not dense_types <= location[0].types:
+                continue
+            if all(entity in sparse_set for sparse_set in sparse_sets):
+                yield entity, self.fetch(entity, component_types)
+
+    def __match(self, key: frozenset[type[Component]]) -> list[Archetype]:
+        if not key:
+            return list(self.__archetypes.values())
+        smallest = min(
+            (
+                self.__archetypes_by_type.get(component_type, [])
+                for component_type in key
+            ),
+            key=len,
+        )
+        return [archetype for archetype in smallest if key <= archetype.types]
+
+    def __get_archetype(self, types: frozenset[type[Component]]) -> Archetype:
+        archetype = self.__archetypes.get(types)
+        if archetype is not None:
+            return archetype
+        archetype = Archetype(types)
+        self.__archetypes[types] = archetype
+        for component_type in types:
+            self.__archetypes_by_type[component_type].append(archetype)
+        for key, matches in self.__matches.items():
+            if key <= types:
+                matches.append(archetype)
+        return archetype
+
+    def __get_sparse(self, component_type: type[Component]) -> SparseSet:
+        sparse_set = self.__sparse.get(component_type)
+        if sparse_set is None:
+            sparse_set = SparseSet()
+            self.__sparse[component_type] = sparse_set
+        return sparse_set
+
+    def __write_through(self, entity: int, component: Any) -> Any:
+        return write_through(component, partial(self.__write, entity, type(component)))
+
+    def __write(
+        self, entity: int, component_type: type[Component], name: str, value: Any
+    ) -> None:
+        # The entity may have moved since the component was read.
+        location = self.__locations.get(entity)
+        if location is None:
+            return
+        archetype, row = location
+        column = archetype.columns.get(component_type)
+        if column is not None:
+            column.arrays[name][row] = value  # type: ignore
+
+    def __remove_row(self, archetype: Archetype, row: int) -> None:
+        moved = archetype.swap_remove(row)
+        if moved is not None:
+            self.__locations[moved] = (archetype, row)
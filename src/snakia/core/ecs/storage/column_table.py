@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..columnar import ColumnarComponent
+
+
+class ColumnView:
+    """
+    Array views of the fields of a columnar component.
+
+    Assigning to a field writes into the underlying column.
+    """
+
+    __slots__ = ("_arrays",)
+
+    _arrays: dict[str, NDArray[Any]]
+
+    def __init__(self, arrays: dict[str, NDArray[Any]]) -> None:
+        object.__setattr__(self, "_arrays", arrays)
+
+    def __len__(self) -> int:
+        for array in self._arrays.values():
+            return len(array)
+        return 0
+
+    def __getattr__(self, name: str) -> NDArray[Any]:
+        try:
+            return self._arrays[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        try:
+            array = self._arrays[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        if value is not array:
+            array[...] = value
+
+
+class ColumnTable:
+    """
+    The rows of a columnar component type, one NumPy array per field.
+    """
+
+    __slots__ = ("component_type", "arrays", "size")
+
+    def __init__(
+        self, component_type: type[ColumnarComponent], capacity: int = 8
+    ) -> None:
+        self.component_type: type[ColumnarComponent] = component_type
+        self.arrays: dict[str, NDArray[Any]] = {
+            name: np.empty(capacity, dtype)
+            for name, dtype in component_type.__columns__.items()
+        }
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, row: int) -> ColumnarComponent:
+        return self.component_type.model_construct(
+            **{name: array[row].item() for name, array in self.arrays.items()}
+        )
+
+    def __setitem__(self, row: int, component: ColumnarComponent) -> None:
+        for name, array in self.arrays.items():
+            array[row] = getattr(component, name)
+
+    @property
+    def capacity(self) -> int:
+        """The number of rows that fit without reallocating."""
+        for array in self.arrays.values():
+            return len(array)
+        return 0
+
+    def reserve(self, capacity: int) -> None:
+        """Grows the arrays to hold at least the given number of rows."""
+        if capacity <= self.capacity:
+            return
+        for name, array in self.arrays.items():
+            grown = np.empty(capacity, array.dtype)
+            grown[: self.size] = array[: self.size]
+            self.arrays[name] = grown
+
+    def append(self, component: ColumnarComponent) -> None:
+        """Appends a row."""
+        if self.size >= self.capacity:
+            self.reserve(max(8, self.size * 2))
+        self[self.size] = component
+        self.size += 1
+
+    def extend(
+        self, rows: Sequence[ColumnarComponent] | Mapping[str, Any], count: int
+    ) -> None:
+        """Appends rows from components or from field columns.
+
+        Field columns may be arrays or single values that fill every row.
+        Missing fields use their default.
+        """
+        start = self.size
+        end = start + count
+        if end > self.capacity:
+            self.reserve(max(8, end, self.size * 2))
+        fields = self.component_type.model_fields
+        for name, array in self.arrays.items():
+            if isinstance(rows, Mapping):
+                if name in rows:
+                    array[start:end] = rows[name]
+                else:
+                    array[start:end] = fields[name].get_default(
+                        call_default_factory=True
+                    )
+            else:
+                array[start:end] = [getattr(row, name) for row in rows]
+        self.size = end
+
+    def swap_remove(self, row: int) -> None:
+        """Removes a row by moving the last row into its place."""
+        last = self.size - 1
+        if row != last:
+            for array in self.arrays.values():
+                array[row] = array[last]
+        self.size = last
+
+    def compact(self, start: int, rows: Sequence[int]) -> None:
+        """Keeps only the given rows from `start` on, moved up in order."""
+        indices = np.asarray(rows, dtype=np.intp)
+        stop = start + len(indices)
+        for array in self.arrays.values():
+            array[start:stop] = array[indices]
+        self.size = stop
+
+    def view(self, start: int = 0, stop: int | None = None) -> ColumnView:
+        """Returns array views of the filled rows, or of a range of them."""
+        stop = self.size if stop is None else min(stop, self.size)
+        return ColumnView(
+            {name: array[start:stop] for name, array in self.arrays.items()}
+        )
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from operator import itemgetter
+from typing import Any
+
+from ..component import Component
+from ..tag import is_tag
+from .storage import Storage, check_columns, to_components
+
+
+class DictStorage(Storage):
+    """
+    A storage that keeps an entity set per component type
+    and a component dict per entity.
+
+    Tags are only kept in their entity set.
+    """
+
+    __components: dict[type[Component], set[int]]
+    __entities: dict[int, dict[type[Component], Component]]
+    __tags: dict[type[Component], set[int]]
+
+    def __init__(self) -> None:
+        self.__components = defaultdict(set)
+        self.__entities = {}
+        self.__tags = {}
+
+    def add_entity(self, entity: int, components: Iterable[Component]) -> None:
+        entity_dict = self.__entities.setdefault(entity, {})
+        for component in components:
+            component_type = type(component)
+            if is_tag(component_type):
+                self.__get_tag(component_type).add(entity)
+                continue
+            self.__components[component_type].add(entity)
+            entity_dict.setdefault(component_type, component)
+
+    def add_entities(
+        self, entities: Sequence[int], columns: Mapping[type[Component], Any]
+    ) -> None:
+        check_columns(columns, len(entities))
+        rows = to_components(columns, len(entities))
+        for component_type in [t for t in rows if is_tag(t)]:
+            self.__get_tag(component_type).update(entities)
+            del rows[component_type]
+        for component_type in rows:
+            self.__components[component_type].update(entities)
+        component_types = tuple(rows)
+        if not component_types:
+            for entity in entities:
+                self.__entities[entity] = {}
+            return
+        self.__entities.update(
+            {
+                entity: dict(zip(component_types, components))
+                for entity, components in zip(entities, zip(*rows.values()))
+            }
+        )
+
+    def remove_entity(self, entity: int) -> None:
+        for component_type in self.__entities.pop(entity):
+            self.__discard(entity, component_type)
+        for entities in self.__tags.values():
+            entities.discard(entity)
+
+    def remove_entities(self, entities: Iterable[int]) -> None:
+        entities = list(entities)
+        removed: dict[type[Component], list[int]] = defaultdict(list)
+        pop = self.__entities.pop
+        for entity in entities:
+            for component_type in pop(entity):
+                removed[component_type].append(entity)
+        for component_type, group in removed.items():
+            self.__components[component_type].difference_update(group)
+            if not self.__components[component_type]:
+                del self.__components[component_type]
+        for tagged in self.__tags.values():
+            tagged.difference_update(entities)
+
+    def has_entity(self, entity: int) -> bool:
+        return entity in self.__entities
+
+    def entities(self) -> Iterator[int]:
+        return iter(list(self.__entities))
+
+    def add_component(self, entity: int, component: Component) -> None:
+        component_type = type(component)
+        if is_tag(component_type):
+            self.__entities.setdefault(entity, {})
+            self.__get_tag(component_type).add(entity)
+            return
+        self.__components[component_type].add(entity)
+        self.__entities.setdefault(entity, {})[component_type] = component
+
+    def remove_component(
+        self, entity: int, component_type: type[Component]
+    ) -> Component:
+        if is_tag(component_type):
+            entities = self.__tags.get(component_type, set())
+            if entity not in entities:
+                raise KeyError(component_type)
+            entities.remove(entity)
+            return component_type()
+        self.__discard(entity, component_type)
+        return self.__entities[entity].pop(component_type)
+
+    def get_component(
+        self, entity: int, component_type: type[Component], default: Any = None
+    ) -> Any:
+        entity_dict = self.__entities.get(entity)
+        if entity_dict is None:
+            return default
+        component = entity_dict.get(component_type)
+        if component is not None:
+            return component
+        if entity in self.__tags.get(component_type, ()):
+            return component_type()
+        return default
+
+    def has_component(self, entity: int, component_type: type[Component]) -> bool:
+        entity_dict = self.__entities.get(entity)
+        if entity_dict is None:
+            return False
+        return component_type in entity_dict or entity in self.__tags.get(
+            component_type, ()
+        )
+
+    def get_entity(self, entity: int) -> dict[type[Component], Component]:
+        components = dict(self.__entities.get(entity, {}))
+        for component_type, entities in self.__tags.items():
+            if entity in entities:
+                components[component_type] = component_type()
+        return components
+
+    def fetch(
+        self, entity: int, component_types: tuple[type[Component], ...]
+    ) -> tuple[Component, ...]:
+        entity_dict = self.__entities[entity]
+        return tuple(
+            (
+                entity_dict[component_type]
+                if component_type in entity_dict
+                else self.__fetch_tag(entity, component_type)
+            )
+            for component_type in component_types
+        )
+
+    def fetcher(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Callable[[int], tuple[Component, ...]]:
+        entities = self.__entities
+        if not component_types:
+            return lambda entity: ()
+        if any(map(is_tag, component_types)):
+            # Tags have a single instance, so only the other types are looked up.
+            template = [t() if is_tag(t) else None for t in component_types]
+            dense = [
+                (index, component_type)
+                for index, component_type in enumerate(component_types)
+                if template[index] is None
+            ]
+
+            def fetch(entity: int) -> tuple[Component, ...]:
+                entity_dict = entities[entity]
+                row = template.copy()
+                for index, component_type in dense:
+                    row[index] = entity_dict[component_type]
+                return tuple(row)  # type: ignore
+
+            return fetch
+        if len(component_types) == 1:
+            (component_type,) = component_types
+            return lambda entity: (entities[entity][component_type],)
+        getter = itemgetter(*component_types)
+        return lambda entity: getter(entities[entity])
+
+    def query(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Iterator[tuple[int, tuple[Component, ...]]]:
+        entity_set = set.intersection(
+            *(
+                (
+                    self.__tags.get(component_type, set())
+                    if is_tag(component_type)
+                    else self.__components[component_type]
+                )
+                for component_type in component_types
+            )
+        )
+        for entity in entity_set:
+            entity_dict = self.__entities[entity]
+            yield (
+                entity,
+                tuple(
+                    (
+                        entity_dict[component_type]
+                        if component_type in entity_dict
+                        else component_type()
+                    )
+                    for component_type in component_types
+                ),
+            )
+
+    def iter_component(
+        self, component_type: type[Component]
+    ) -> Iterator[tuple[int, Component]]:
+        if is_tag(component_type):
+            tag = component_type()
+            return ((entity, tag) for entity in list(self.__entity_set(component_type)))
+        entities = self.__entities
+        return (
+            (entity, entities[entity][component_type])
+            for entity in list(self.__components.get(component_type, ()))
+        )
+
+    def blocks(
+        self, size: int
+    ) -> Iterator[tuple[list[int], dict[type[Component], Sequence[Any]]]]:
+        groups: dict[frozenset[type[Component]], list[int]] = {}
+        tags = self.__tags.items()
+        for entity, entity_dict in self.__entities.items():
+            types = frozenset(
+                (*entity_dict, *(t for t, entities in tags if entity in entities))
+            )
+            groups.setdefault(types, []).append(entity)
+        for types, entities in groups.items():
+            component_types = tuple(types)
+            for start in range(0, len(entities), size):
+                chunk = entities[start : start + size]
+                yield chunk, dict(
+                    zip(component_types, self.fetch_chunk(chunk, component_types))
+                )
+
+    def match_entities(
+        self,
+        required: Iterable[type[Component]],
+        excluded: Iterable[type[Component]] = (),
+        any_of: Iterable[Iterable[type[Component]]] = (),
+    ) -> set[int]:
+        sets = [self.__entity_set(component_type) for component_type in required]
+        for group in any_of:
+            sets.append(set().union(*map(self.__entity_set, group)))
+        if not sets:
+            raise ValueError("Nothing to match entities on")
+        entities = set.intersection(*sets)
+        for component_type in excluded:
+            entities -= self.__entity_set(component_type)
+        return entities
+
+    def clear(self) -> None:
+        # Cleared in place, as fetchers keep a reference to the dicts.
+        self.__components.clear()
+        self.__entities.clear()
+        self.__tags.clear()
+
+    def __entity_set(self, component_type: type[Component]) -> set[int]:
+        if is_tag(component_type):
+            return self.__tags.get(component_type, set())
+        return self.__components.get(component_type, set())
+
+    def __get_tag(self, tag_type: type[Component]) -> set[int]:
+        entities = self.__tags.get(tag_type)
+        if entities is None:
+            entities = self.__tags[tag_type] = set()
+        return entities
+
+    def __fetch_tag(self, entity: int, component_type: type[Component]) -> Component:
+        if entity not in self.__tags.get(component_type, ()):
+            raise KeyError(component_type)
+        return component_type()
+
+    def __discard(self, entity: int, component_type: type[Component]) -> None:
+        entities = self.__components.get(component_type)
+        if entities is None:
+            return
+        entities.discard(entity)
+        if not entities:
+            del self.__components[component_type]
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+
+from ..columnar import ColumnarComponent
+from .storage import Storage
+from .table_storage import TableStorage
+
+
+class MappedStorage(TableStorage):
+    """
+    A storage that keeps the given columnar component types in
+    memory-mapped files of fixed-layout records, and the other components
+    in an inner storage.
+
+    Records stay in the files across restarts: a storage opened on the
+    same directory finds its entities again without loading their components.
+    Column queries of mapped types read the files without copying.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        component_types: Iterable[type[ColumnarComponent]],
+        storage: Storage | None = None,
+    ) -> None:
+        # numpy is an optional dependency, only needed for mapped components.
+        # noqa: C0415 # pylint: disable=C0415
+        from .mapped_table import MappedTable
+
+        directory = os.fspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        tables = {}
+        for component_type in component_types:
+            if not issubclass(component_type, ColumnarComponent):
+                raise TypeError(f"{component_type.__name__} is not a ColumnarComponent")
+            name = f"{component_type.__module__}.{component_type.__qualname__}.bin"
+            tables[component_type] = MappedTable(
+                component_type, os.path.join(directory, name)
+            )
+        super().__init__(tables, storage)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+from typing import Any, Final
+
+import numpy as np
+
+from ..columnar import ColumnarComponent
+from .record_table import RecordTable, record_dtype
+
+MAGIC: Final = b"SNKM"
+ALIGNMENT: Final = 64
+
+_HEADER = struct.Struct("<4sI")
+
+
+class MappedTable(RecordTable):
+    """
+    The components of a columnar type as fixed-layout records
+    in a memory-mapped file, one record per entity slot.
+
+    The file keeps its records across restarts, and only the pages
+    that are touched are loaded into memory.
+    """
+
+    __slots__ = ("path", "__dtype", "__offset")
+
+    def __init__(
+        self, component_type: type[ColumnarComponent], path: str | os.PathLike[str]
+    ) -> None:
+        self.path = os.fspath(path)
+        self.__dtype = record_dtype(component_type)
+        header = json.dumps(
+            {
+                "type": f"{component_type.__module__}:{component_type.__qualname__}",
+                "fields": self.__dtype.descr,
+            }
+        ).encode()
+        self.__offset = -(-(_HEADER.size + len(header)) // ALIGNMENT) * ALIGNMENT
+        if os.path.exists(self.path):
+            self.__check_header(component_type, header)
+        else:
+            with open(self.path, "wb") as file:
+                file.write(_HEADER.pack(MAGIC, len(header)))
+                file.write(header)
+                file.truncate(self.__offset)
+        super().__init__(component_type, self.__map())
+
+    def reserve(self, capacity: int) -> None:
+        """Grows the file to hold at least the given number of slots.
+
+        Views taken before growing keep showing the old mapping.
+        """
+        if capacity <= self.capacity:
+            return
+        capacity = max(capacity, self.capacity * 2, 64)
+        self._records.flush()
+        with open(self.path, "r+b") as file:
+            file.truncate(self.__offset + capacity * self.__dtype.itemsize)
+        self._records = self.__map()
+
+    def flush(self) -> None:
+        """Writes the changes to the file."""
+        self._records.flush()
+
+    def __map(self) -> np.memmap[Any, np.dtype[Any]]:
+        size = os.path.getsize(self.path) - self.__offset
+        count = size // self.__dtype.itemsize
+        if count == 0:
+            # A file can not be mapped with no records, so map a single free one.
+            with open(self.path, "r+b") as file:
+                file.truncate(self.__offset + self.__dtype.itemsize)
+            count = 1
+        return np.memmap(
+            self.path, dtype=self.__dtype, mode="r+", offset=self.__offset, shape=count
+        )
+
+    def __check_header(
+        self, component_type: type[ColumnarComponent], header: bytes
+    ) -> None:
+        with open(self.path, "rb") as file:
+            magic, size = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a component file")
+            if file.read(size) != header:
+                raise ValueError(
+                    f"{self.path} has another layout than {component_type.__name__}"
+                )
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..columnar import ColumnarComponent, write_through
+from ..entity_pool import INDEX_MASK
+from .column_table import ColumnView
+
+
+def record_dtype(component_type: type[ColumnarComponent]) -> np.dtype[Any]:
+    """Returns the little-endian record layout of a columnar component type."""
+    fields = [("entity", "<u8")]
+    fields.extend(
+        (name, np.dtype(dtype).newbyteorder("<").str)
+        for name, dtype in component_type.__columns__.items()
+    )
+    return np.dtype(fields)
+
+
+def query_tables(
+    tables: Sequence[RecordTable],
+) -> Iterator[tuple[tuple[int, ...], tuple[ColumnView, ...]]]:
+    """Yields the entities and column views of every run of slots
+    whose records belong to the same entity in all the tables.
+    """
+    capacity = min(table.capacity for table in tables)
+    ids = tables[0].ids()[:capacity]
+    mask = ids != 0
+    for table in tables[1:]:
+        mask &= table.ids()[:capacity] == ids
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    for start, stop in zip(edges[::2].tolist(), edges[1::2].tolist()):
+        yield tuple(ids[start:stop].tolist()), tuple(
+            table.view(start, stop) for table in tables
+        )
+
+
+class RecordTable(ABC):
+    """
+    The components of a columnar type as fixed-layout records,
+    one record per entity slot.
+
+    A record holds the entity id, or 0 for a free slot, followed by the fields.
+    Subclasses provide the memory the records live in.
+    """
+
+    __slots__ = ("component_type", "_records", "_count")
+
+    def __init__(
+        self, component_type: type[ColumnarComponent], records: NDArray[Any]
+    ) -> None:
+        self.component_type: type[ColumnarComponent] = component_type
+        self._records = records
+        self._count = int(np.count_nonzero(records["entity"]))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, entity: object) -> bool:
+        if not isinstance(entity, int):
+            return False
+        index = entity & INDEX_MASK
+        records = self._records
+        return index < len(records) and int(records["entity"][index]) == entity
+
+    @property
+    def capacity(self) -> int:
+        """The number of entity slots."""
+        return len(self._records)
+
+    def get(self, entity: int, default: Any = None) -> Any:
+        """Returns a copy of the component of an entity, or the default.
+
+        Assigning to the fields of the copy writes into the record.
+        """
+        if entity not in self:
+            return default
+        record = self._records[entity & INDEX_MASK]
+        component = self.component_type.model_construct(
+            **{name: record[name].item() for name in self.component_type.__columns__}
+        )
+        return write_through(
+            component, lambda name, value: self.__write(entity, name, value)
+        )
+
+    def set(self, entity: int, component: ColumnarComponent) -> None:
+        """Writes the component of an entity."""
+        index = entity & INDEX_MASK
+        self.reserve(index + 1)
+        record = self._records[index]
+        if int(record["entity"]) != entity:
+            self._count += 1
+        record["entity"] = entity
+        for name in self.component_type.__columns__:
+            record[name] = getattr(component, name)
+
+    def set_many(
+        self,
+        entities: Sequence[int],
+        rows: Sequence[ColumnarComponent] | Mapping[str, Any],
+    ) -> None:
+        """Writes the components of several entities, from components or field columns."""
+        if not isinstance(rows, Mapping):
+            for entity, component in zip(entities, rows):
+                self.set(entity, component)
+            return
+        ids = np.asarray(entities, dtype=np.uint64)
+        indices = ids & INDEX_MASK
+        if len(indices):
+            self.reserve(int(indices.max()) + 1)
+        records = self._records
+        self._count += int(np.count_nonzero(records["entity"][indices] != ids))
+        records["entity"][indices] = ids
+        fields = self.component_type.model_fields
+        for name in self.component_type.__columns__:
+            if name in rows:
+                records[name][indices] = rows[name]
+            else:
+                records[name][indices] = fields[name].get_default(
+                    call_default_factory=True
+                )
+
+    def remove(self, entity: int) -> ColumnarComponent:
+        """Frees the record of an entity and returns its component."""
+        component = self.get(entity)
+        if component is None:
+            raise KeyError(entity)
+        self._records[entity & INDEX_MASK]["entity"] = 0
+        self._count -= 1
+        return component  # type: ignore
+
+    def remove_many(self, entities: Sequence[int]) -> None:
+        """Frees the records of those of the entities, each given once,
+        that have one."""
+        ids = np.asarray(entities, dtype=np.uint64)
+        indices = ids & INDEX_MASK
+        inside = indices < len(self._records)
+        ids, indices = ids[inside], indices[inside]
+        slots = self._records["entity"]
+        owned = slots[indices] == ids
+        slots[indices[owned]] = 0
+        self._count -= int(np.count_nonzero(owned))
+
+    def entities(self) -> Iterator[int]:
+        """Yields the entities that have a record."""
+        ids = self._records["entity"]
+        yield from ids[ids != 0].tolist()
+
+    def ids(self) -> NDArray[np.uint64]:
+        """Returns a view of the entity ids of all slots, 0 for free ones."""
+        return self._records["entity"]
+
+    def view(self, start: int = 0, stop: int | None = None) -> ColumnView:
+        """Returns views of the fields of a range of slots, backed by the records."""
+        records = self._records[start:stop]
+        return ColumnView(
+            {name: records[name] for name in self.component_type.__columns__}
+        )
+
+    def gather(self, entities: Sequence[int]) -> ColumnView:
+        """Returns copies of the fields of the given entities."""
+        indices = np.asarray(entities, dtype=np.uint64) & INDEX_MASK
+        records = self._records[indices]
+        return ColumnView(
+            {
+                name: np.ascontiguousarray(records[name])
+                for name in self.component_type.__columns__
+            }
+        )
+
+    def __write(self, entity: int, name: str, value: Any) -> None:
+        if entity in self:
+            self._records[name][entity & INDEX_MASK] = value
+
+    @abstractmethod
+    def reserve(self, capacity: int) -> None:
+        """Makes room for at least the given number of slots."""
+
+    def clear(self) -> None:
+        """Frees every record."""
+        self._records["entity"] = 0
+        self._count = 0
+
+    def flush(self) -> None:
+        """Writes the changes to the backing memory, if it needs it."""
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+
+from ..columnar import ColumnarComponent
+from .record_table import RecordTable, record_dtype
+
+
+class SharedTable(RecordTable):
+    """
+    The components of a columnar type as fixed-layout records
+    in a block of shared memory, one record per entity slot.
+
+    The process that creates a table owns its block and frees it on `close`.
+    Other processes attach to the block by name, or by unpickling the table.
+    The block does not grow, so slots past the capacity can not be used.
+    """
+
+    __slots__ = ("__memory", "__owner")
+
+    def __init__(
+        self,
+        component_type: type[ColumnarComponent],
+        capacity: int = 0,
+        name: str | None = None,
+    ) -> None:
+        dtype = record_dtype(component_type)
+        if name is None:
+            self.__memory = SharedMemory(
+                create=True, size=max(capacity, 1) * dtype.itemsize
+            )
+        else:
+            self.__memory = SharedMemory(name)
+        self.__owner = name is None
+        records = np.ndarray(
+            self.__memory.size // dtype.itemsize, dtype=dtype, buffer=self.__memory.buf
+        )
+        if self.__owner:
+            records["entity"] = 0
+        super().__init__(component_type, records)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (self.component_type, 0, self.name)
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block."""
+        return self.__memory.name
+
+    def reserve(self, capacity: int) -> None:
+        """Checks that the block holds the given number of slots."""
+        if capacity > self.capacity:
+            raise IndexError(
+                f"{self.component_type.__name__} table holds {self.capacity} slots"
+            )
+
+    def close(self) -> None:
+        """Detaches from the block, and frees it if this table created it.
+
+        Views of the records must not be used afterwards.
+        """
+        self._records = np.empty(0, dtype=self._records.dtype)
+        self._count = 0
+        try:
+            self.__memory.close()
+        except BufferError:
+            # Views still reference the block, it is unmapped once they are gone.
+            pass
+        if self.__owner:
+            self.__memory.unlink()
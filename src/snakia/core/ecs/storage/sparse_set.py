@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Any
+
+from ..component import Component
+from ..entity_pool import INDEX_MASK
+
+
+def is_sparse(component_type: type[Component]) -> bool:
+    """Returns True if the component type asks for sparse-set storage."""
+    return getattr(component_type, "__sparse__", False)
+
+
+class SparseSet:
+    """
+    Stores the components of one type in dense arrays,
+    indexed by the slot of each entity through a sparse array.
+
+    Adding, removing and finding a component are O(1),
+    and never move the other components of the entity.
+    """
+
+    __slots__ = ("entities", "components", "__sparse")
+
+    def __init__(self) -> None:
+        self.entities: list[int] = []
+        self.components: list[Component] = []
+        self.__sparse: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __contains__(self, entity: int) -> bool:
+        index = entity & INDEX_MASK
+        if index >= len(self.__sparse):
+            return False
+        dense = self.__sparse[index]
+        return dense < len(self.entities) and self.entities[dense] == entity
+
+    def get(self, entity: int, default: Any = None) -> Any:
+        """Returns the component of an entity, or the default."""
+        if entity not in self:
+            return default
+        return self.components[self.__sparse[entity & INDEX_MASK]]
+
+    def add(self, entity: int, component: Component) -> None:
+        """Adds or replaces the component of an entity."""
+        index = entity & INDEX_MASK
+        if entity in self:
+            self.components[self.__sparse[index]] = component
+            return
+        sparse = self.__sparse
+        if index >= len(sparse):
+            sparse.extend([0] * (index + 1 - len(sparse)))
+        sparse[index] = len(self.entities)
+        self.entities.append(entity)
+        self.components.append(component)
+
+    def remove(self, entity: int) -> Component:
+        """Removes the component of an entity and returns it."""
+        if entity not in self:
+            raise KeyError(entity)
+        sparse = self.__sparse
+        dense = sparse[entity & INDEX_MASK]
+        component = self.components[dense]
+        last_entity = self.entities.pop()
+        last_component = self.components.pop()
+        if dense < len(self.entities):
+            self.entities[dense] = last_entity
+            self.components[dense] = last_component
+            sparse[last_entity & INDEX_MASK] = dense
+        return component
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+from ..columnar import ColumnarComponent
+from ..component import Component
+
+
+def to_components(
+    columns: Mapping[type[Component], Any], count: int
+) -> dict[type[Component], Sequence[Component]]:
+    """Turns the field columns of columnar components into components."""
+    return {
+        component_type: (
+            component_type.from_columns(column, count)
+            if isinstance(column, Mapping)
+            and issubclass(component_type, ColumnarComponent)
+            else column
+        )
+        for component_type, column in columns.items()
+    }
+
+
+def check_columns(columns: Mapping[type[Component], Any], count: int) -> None:
+    """Raises ValueError unless every column holds `count` values.
+
+    Field columns of columnar components may also be single values.
+    """
+    for component_type, column in columns.items():
+        if isinstance(column, Mapping) and issubclass(
+            component_type, ColumnarComponent
+        ):
+            for name, values in column.items():
+                if getattr(values, "ndim", 1) == 0 or not hasattr(values, "__len__"):
+                    continue
+                if len(values) != count:
+                    raise ValueError(
+                        f"Expected {count} values for {component_type.__name__}.{name},"
+                        f" got {len(values)}"
+                    )
+        elif len(column) != count:
+            raise ValueError(
+                f"Expected {count} {component_type.__name__}, got {len(column)}"
+            )
+
+
+class Storage(ABC):
+    """
+    A storage keeps the components of the entities of a system.
+    """
+
+    @abstractmethod
+    def add_entity(self, entity: int, components: Iterable[Component]) -> None:
+        """Adds an entity with the given components.
+
+        If several components share a type, the first one is kept.
+        """
+
+    def add_entities(
+        self, entities: Sequence[int], columns: Mapping[type[Component], Any]
+    ) -> None:
+        """Adds new entities that have the same component types.
+
+        Each column holds the components of one type, in the order of the entities.
+        Columns of columnar components may map field names to arrays instead.
+        """
+        rows = to_components(columns, len(entities))
+        for index, entity in enumerate(entities):
+            self.add_entity(entity, [column[index] for column in rows.values()])
+
+    @abstractmethod
+    def remove_entity(self, entity: int) -> None:
+        """Removes an entity and all its components."""
+
+    def remove_entities(self, entities: Iterable[int]) -> None:
+        """Removes several stored entities, each given once,
+        and all their components."""
+        for entity in entities:
+            self.remove_entity(entity)
+
+    @abstractmethod
+    def has_entity(self, entity: int) -> bool:
+        """Returns True if the entity is stored."""
+
+    def entities(self) -> Iterator[int]:
+        """Yields every stored entity once."""
+        seen: set[int] = set()
+        for block, _ in self.blocks(1024):
+            for entity in block:
+                if entity not in seen:
+                    seen.add(entity)
+                    yield entity
+
+    @abstractmethod
+    def add_component(self, entity: int, component: Component) -> None:
+        """Adds a component to an entity, replacing one of the same type."""
+
+    @abstractmethod
+    def remove_component(
+        self, entity: int, component_type: type[Component]
+    ) -> Component:
+        """Removes a component from an entity and returns it."""
+
+    @abstractmethod
+    def get_component(
+        self, entity: int, component_type: type[Component], default: Any = None
+    ) -> Any:
+        """Returns the component of the given entity."""
+
+    @abstractmethod
+    def has_component(self, entity: int, component_type: type[Component]) -> bool:
+        """Returns True if the entity has the given component."""
+
+    @abstractmethod
+    def get_entity(self, entity: int) -> dict[type[Component], Component]:
+        """Returns all components of the given entity."""
+
+    @abstractmethod
+    def fetch(
+        self, entity: int, component_types: tuple[type[Component], ...]
+    ) -> tuple[Component, ...]:
+        """Returns the given components of an entity that has all of them."""
+
+    def fetcher(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Callable[[int], tuple[Component, ...]]:
+        """Returns a function that does `fetch` for the given types,
+        resolving what depends only on the types once."""
+        fetch = self.fetch
+        return lambda entity: fetch(entity, component_types)
+
+    @abstractmethod
+    def query(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Iterator[tuple[int, tuple[Component, ...]]]:
+        """Returns all entities with the given components."""
+
+    def iter_component(
+        self, component_type: type[Component]
+    ) -> Iterator[tuple[int, Component]]:
+        """Returns all entities with a component of the given type, with the component."""
+        for entity, (component,) in self.query((component_type,)):
+            yield entity, component
+
+    @abstractmethod
+    def blocks(
+        self, size: int
+    ) -> Iterator[tuple[list[int], dict[type[Component], Sequence[Any]]]]:
+        """Yields every entity with its components in blocks of at most `size`.
+
+        Each block maps component types to sequences aligned with its entities,
+        as taken by `add_entities`. An entity may appear in several blocks,
+        in which case the later blocks add components to it.
+        """
+
+    def fetch_chunk(
+        self, entities: Sequence[int], component_types: tuple[type[Component], ...]
+    ) -> tuple[list[Any], ...]:
+        """Returns a list of components per type, aligned with the entities.
+
+        Missing components are None.
+        """
+        get = self.get_component
+        return tuple(
+            [get(entity, component_type) for entity in entities]
+            for component_type in component_types
+        )
+
+    def match_entities(
+        self,
+        required: Iterable[type[Component]],
+        excluded: Iterable[type[Component]] = (),
+        any_of: Iterable[Iterable[type[Component]]] = (),
+    ) -> set[int]:
+        """Returns the entities that have all the required types,
+        none of the excluded types and at least one type of each group.
+
+        Components are not fetched.
+        """
+        required = tuple(required)
+        excluded = tuple(excluded)
+        groups = [tuple(group) for group in any_of]
+        if required:
+            candidates = {entity for entity, _ in self.query(required)}
+        elif groups:
+            candidates = {
+                entity
+                for component_type in groups.pop(0)
+                for entity, _ in self.query((component_type,))
+            }
+        else:
+            raise ValueError("Nothing to match entities on")
+        has = self.has_component
+        return {
+            entity
+            for entity in candidates
+            if not any(has(entity, t) for t in excluded)
+            and all(any(has(entity, t) for t in group) for group in groups)
+        }
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes all entities."""
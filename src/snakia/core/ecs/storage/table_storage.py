@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+from ..columnar import ColumnarComponent
+from ..component import Component
+from .dict_storage import DictStorage
+from .storage import Storage
+
+if TYPE_CHECKING:
+    from .column_table import ColumnView
+    from .record_table import RecordTable
+
+
+class TableStorage(Storage):
+    """
+    A storage that keeps some columnar component types in tables of
+    fixed-layout records, one per type, and the other components
+    in an inner storage.
+
+    Column queries of the table types read the records without copying.
+    Entities that only have table components are found from the records,
+    so opening tables that already hold entities loads nothing per entity.
+    """
+
+    __tables: dict[type[Component], RecordTable]
+    __storage: Storage
+
+    def __init__(
+        self,
+        tables: Mapping[type[ColumnarComponent], RecordTable],
+        storage: Storage | None = None,
+    ) -> None:
+        self.__storage = DictStorage() if storage is None else storage
+        self.__tables = dict(tables)
+
+    @property
+    def storage(self) -> Storage:
+        """The storage of the components that have no table."""
+        return self.__storage
+
+    def get_table(self, component_type: type[Component]) -> RecordTable | None:
+        """Returns the table of a component type, if it has one."""
+        return self.__tables.get(component_type)
+
+    def flush(self) -> None:
+        """Writes the changes of every table to its backing memory."""
+        for table in self.__tables.values():
+            table.flush()
+
+    def add_entity(self, entity: int, components: Iterable[Component]) -> None:
+        others: list[Component] = []
+        in_table = False
+        for component in components:
+            table = self.__tables.get(type(component))
+            if table is None:
+                others.append(component)
+                continue
+            in_table = True
+            if entity not in table:
+                table.set(entity, component)  # type: ignore
+        if others or not in_table:
+            self.__storage.add_entity(entity, others)
+
+    def add_entities(
+        self, entities: Sequence[int], columns: Mapping[type[Component], Any]
+    ) -> None:
+        others: dict[type[Component], Any] = {}
+        for component_type, column in columns.items():
+            table = self.__tables.get(component_type)
+            if table is None:
+                others[component_type] = column
+            else:
+                table.set_many(entities, column)
+        if others or len(others) == len(columns):
+            self.__storage.add_entities(entities, others)
+
+    def remove_entity(self, entity: int) -> None:
+        found = self.__storage.has_entity(entity)
+        if found:
+            self.__storage.remove_entity(entity)
+        for table in self.__tables.values():
+            if entity in table:
+                table.remove(entity)
+                found = True
+        if not found:
+            raise KeyError(entity)
+
+    def remove_entities(self, entities: Iterable[int]) -> None:
+        entities = list(entities)
+        storage = self.__storage
+        storage.remove_entities([e for e in entities if storage.has_entity(e)])
+        for table in self.__tables.values():
+            table.remove_many(entities)
+
+    def has_entity(self, entity: int) -> bool:
+        return self.__storage.has_entity(entity) or any(
+            entity in table for table in self.__tables.values()
+        )
+
+    def entities(self) -> Iterator[int]:
+        storage = self.__storage
+        yield from storage.entities()
+        has = storage.has_entity
+        tables = list(self.__tables.values())
+        for index, table in enumerate(tables):
+            # Each entity is yielded from the first place that holds it.
+            earlier = tables[:index]
+            if earlier:
+                yield from (
+                    entity
+                    for entity in table.entities()
+                    if not has(entity) and not any(entity in t for t in earlier)
+                )
+            else:
+                yield from (entity for entity in table.entities() if not has(entity))
+
+    def add_component(self, entity: int, component: Component) -> None:
+        table = self.__tables.get(type(component))
+        if table is None:
+            self.__storage.add_component(entity, component)
+            return
+        table.set(entity, component)  # type: ignore
+
+    def remove_component(
+        self, entity: int, component_type: type[Component]
+    ) -> Component:
+        table = self.__tables.get(component_type)
+        if table is None:
+            return self.__storage.remove_component(entity, component_type)
+        if entity not in table:
+            raise KeyError(component_type)
+        component = table.remove(entity)
+        if not self.has_entity(entity):
+            # The entity outlives its last component, as in other storages.
+            self.__storage.add_entity(entity, ())
+        return component
+
+    def get_component(
+        self, entity: int, component_type: type[Component], default: Any = None
+    ) -> Any:
+        table = self.__tables.get(component_type)
+        if table is None:
+            return self.__storage.get_component(entity, component_type, default)
+        return table.get(entity, default)
+
+    def has_component(self, entity: int, component_type: type[Component]) -> bool:
+        table = self.__tables.get(component_type)
+        if table is None:
+            return self.__storage.has_component(entity, component_type)
+        return entity in table
+
+    def get_entity(self, entity: int) -> dict[type[Component], Component]:
+        components = self.__storage.get_entity(entity)
+        for component_type, table in self.__tables.items():
+            component = table.get(entity)
+            if component is not None:
+                components[component_type] = component
+        return components
+
+    def fetch(
+        self, entity: int, component_types: tuple[type[Component], ...]
+    ) -> tuple[Component, ...]:
+        tables = self.__tables
+        if not any(component_type in tables for component_type in component_types):
+            return self.__storage.fetch(entity, component_types)
+        return tuple(
+            (
+                tables[component_type].get(entity)
+                if component_type in tables
+                else self.__storage.get_component(entity, component_type)
+            )
+            for component_type in component_types
+        )
+
+    def query(
+        self, component_types: tuple[type[Component], ...]
+    ) -> Iterator[tuple[int, tuple[Component, ...]]]:
+        tables = [self.__tables[t] for t in component_types if t in self.__tables]
+        if not tables:
+            yield from self.__storage.query(component_types)
+            return
+        others = tuple(t for t in component_types if t not in self.__tables)
+        if others:
+            candidates: Iterable[int] = [
+                entity for entity, _ in self.__storage.query(others)
+            ]
+        else:
+            candidates = min(tables, key=len).entities()
+        for entity in candidates:
+            if all(entity in table for table in tables):
+                yield entity, self.fetch(entity, component_types)
+
+    def query_columns(
+        self, component_types: tuple[type[ColumnarComponent], ...]
+    ) -> Iterator[tuple[tuple[int, ...], tuple[ColumnView, ...]]]:
+        """Returns the entities and column views of every run of slots
+        that have all the given table components.
+
+        The views read and write the records directly.
+        """
+        tables = [
+            self.__tables.get(component_type) for component_type in component_types
+        ]
+        if not all(tables):
+            raise TypeError("Column queries of a TableStorage need table types")
+        # numpy is an optional dependency, only needed for table components.
+        # noqa: C0415 # pylint: disable=C0415
+        from .record_table import query_tables
+
+        return query_tables(tables)  # type: ignore
+
+    def blocks(
+        self, size: int
+    ) -> Iterator[tuple[list[int], dict[type[Component], Sequence[Any]]]]:
+        yield from self.__storage.blocks(size)
+        for component_type, table in self.__tables.items():
+            entities = list(table.entities())
+            for start in range(0, len(entities), size):
+                chunk = entities[start : start + size]
+                yield chunk, {component_type: table.gather(chunk)}  # type: ignore
+
+    def match_entities(
+        self,
+        required: Iterable[type[Component]],
+        excluded: Iterable[type[Component]] = (),
+        any_of: Iterable[Iterable[type[Component]]] = (),
+    ) -> set[int]:
+        required = tuple(required)
+        excluded = tuple(excluded)
+        groups = [tuple(group) for group in any_of]
+        tables = self.__tables
+        types = (*required, *excluded, *(t for group in groups for t in group))
+        if not any(component_type in tables for component_type in types):
+            return self.__storage.match_entities(required, excluded, groups)
+        return super().match_entities(required, excluded, groups)
+
+    def clear(self) -> None:
+        self.__storage.clear()
+        for table in self.__tables.values():
+            table.clear()
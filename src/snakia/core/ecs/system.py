@@ -1,16 +1,35 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from collections.abc import Iterable
-from itertools import count
-from typing import Any, TypeVar, cast, overload
-
-import networkx as nx  # type: ignore
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock
+from typing import TYPE_CHECKING, Any, BinaryIO, TypeVar, cast, overload
 
 from snakia.utils import nolock
 
+from . import snapshot
+from .change_tracker import ChangeTracker
+from .columnar import ColumnarComponent
+from .command_buffer import CommandBuffer
 from .component import Component
+from .criteria import RunCriterion, record_run
+from .delta import Delta
+from .entity_pool import EntityPool
+from .hierarchy import Hierarchy
+from .observer import ComponentObserver, EntityObserver
+from .plan import ExecutionPlan
+from .prefab import Prefab
 from .processor import Processor
+from .profiler import Profiler
+from .query import CHUNK_SIZE, Query
+from .resources import Resources
+from .scheduler import Scheduler
+from .storage import ArchetypeStorage, DictStorage, Storage, TableStorage
+from .storage.storage import check_columns, to_components
+from .terms import ChangeTerm, Term
+
+if TYPE_CHECKING:
+    from .storage.column_table import ColumnView
 
 A = TypeVar("A", bound=Component)
 B = TypeVar("B", bound=Component)
@@ -21,38 +40,164 @@ E = TypeVar("E", bound=Component)
 P = TypeVar("P", bound=Processor)
 
 
-class System:
+class System:  # noqa: R0902, R0904 # pylint: disable=R0902,R0904
     """
     A system is a collection of entities and components that can be processed by processors.
+
+    Args:
+        storage (Storage | None): The component storage to use.
+            Defaults to a new `DictStorage`.
+        workers (int | None): The number of threads used to run processors
+            that do not conflict in parallel. Processors run one by one if None.
     """
 
     __processors: list[Processor]
-    __components: dict[type[Component], set[int]]
-    __entitites: dict[int, dict[type[Component], Component]]
-    __entity_counter: count[int]
+    __plan: ExecutionPlan | None
+    __workers: int | None
+    __executor: ThreadPoolExecutor | None
+    __parallel: bool
+    __storage: Storage
+    __queries: dict[tuple[type[Component] | Term, ...], Query[Any]]
+    __tracker: ChangeTracker
+    __observers: dict[type[Component], list[ComponentObserver]]
+    __entity_observers: list[EntityObserver]
+    __entities: EntityPool
+    __entities_lock: Lock
+    __commands: CommandBuffer
     __dead_entities: set[int]
+    __hierarchy: Hierarchy | None
+    __prefabs: dict[str, Prefab]
+    __profiler: Profiler | None
+    __structural_changes: int
+    __tick: int
+    __resources: Resources
+    __group_criteria: dict[str, tuple[RunCriterion, ...]]
+    __group_runs: dict[str, bool]
     __is_running: bool
 
-    def __init__(self) -> None:
+    def __init__(
+        self, storage: Storage | None = None, workers: int | None = None
+    ) -> None:
         self.__processors = []
-        self.__components = defaultdict(set)
-        self.__entitites = defaultdict(dict)
-        self.__entity_counter = count(start=1)
+        self.__plan = None
+        self.__workers = workers
+        self.__executor = None
+        self.__parallel = False
+        self.__storage = DictStorage() if storage is None else storage
+        self.__queries = {}
+        self.__tracker = ChangeTracker()
+        self.__observers = {}
+        self.__entity_observers = []
+        self.__entities = EntityPool()
+        self.__entities_lock = Lock()
+        self.__commands = CommandBuffer(self)
         self.__dead_entities = set()
+        self.__hierarchy = None
+        self.__prefabs = {}
+        self.__profiler = None
+        self.__structural_changes = 0
+        self.__tick = 0
+        self.__resources = Resources()
+        self.__group_criteria = {}
+        self.__group_runs = {}
         self.__is_running = False
+        for entity in self.__storage.entities():
+            self.__entities.claim(entity)
 
     @property
     def is_running(self) -> bool:
         """Returns True if the system is running."""
         return self.__is_running
 
+    @property
+    def commands(self) -> CommandBuffer:
+        """Returns the command buffer of the system.
+
+        Structural changes recorded in it are applied after each processor,
+        or after each stage when processors run in parallel.
+        """
+        return self.__commands
+
+    @property
+    def plan(self) -> ExecutionPlan:
+        """Returns the execution plan of the processors.
+
+        It is compiled on first use and kept until the processors change.
+        """
+        if self.__plan is None:
+            self.__plan = ExecutionPlan(self.__processors)
+        return self.__plan
+
+    @property
+    def stages(self) -> tuple[tuple[Processor, ...], ...]:
+        """Returns the groups of processors that can run in parallel, in order."""
+        return self.plan.stages
+
+    @property
+    def hierarchy(self) -> Hierarchy:
+        """Returns the parent and child relations of the entities.
+
+        It is created on first use, so systems without relations
+        do not pay for following deletions.
+        """
+        if self.__hierarchy is None:
+            self.__hierarchy = Hierarchy(self)
+        return self.__hierarchy
+
+    @property
+    def storage(self) -> Storage:
+        """Returns the component storage of the system."""
+        return self.__storage
+
+    @property
+    def resources(self) -> Resources:
+        """Returns the singletons of the system, stored by type.
+
+        Resources are not entities: queries, observers and snapshots
+        do not see them.
+        """
+        return self.__resources
+
+    @property
+    def tick(self) -> int:
+        """Returns the number of updates started so far."""
+        return self.__tick
+
+    @property
+    def profiler(self) -> Profiler | None:
+        """Returns the profiler measuring the processors, if profiling is enabled."""
+        return self.__profiler
+
+    def enable_profiling(self, profiler: Profiler | None = None) -> Profiler:
+        """Measures every processor run with the given or a new profiler."""
+        self.__profiler = Profiler() if profiler is None else profiler
+        return self.__profiler
+
+    def disable_profiling(self) -> None:
+        """Stops measuring the processors."""
+        self.__profiler = None
+
     def full_reset(self) -> None:
         """Resets the system to its initial state."""
+        self.__shutdown_executor()
         self.__processors = []
-        self.__components = defaultdict(set)
-        self.__entitites = defaultdict(dict)
-        self.__entity_counter = count(start=1)
+        self.__plan = None
+        self.__storage.clear()
+        self.__queries = {}
+        self.__tracker = ChangeTracker()
+        self.__observers = {}
+        self.__entity_observers = []
+        self.__entities = EntityPool()
+        self.__commands.clear()
         self.__dead_entities = set()
+        self.__hierarchy = None
+        self.__prefabs = {}
+        self.__profiler = None
+        self.__structural_changes = 0
+        self.__tick = 0
+        self.__resources.clear()
+        self.__group_criteria = {}
+        self.__group_runs = {}
 
     def get_processor(self, processor_type: type[P], /) -> P | None:
         """Returns the first processor of the given type."""
@@ -64,13 +209,114 @@ class System:
     def add_processor(self, proccessor: Processor) -> None:
         """Adds a processor to the system."""
         self.__processors.append(proccessor)
-        self._sort_processors()
+        self.__plan = None
 
     def remove_processor(self, processor_type: type[Processor]) -> None:
         """Removes a processor from the system."""
-        for processor in self.__processors:
-            if isinstance(processor, processor_type):
-                self.__processors.remove(processor)
+        self.__processors = [
+            processor
+            for processor in self.__processors
+            if not isinstance(processor, processor_type)
+        ]
+        self.__plan = None
+
+    def set_group_criteria(self, group: str, *criteria: RunCriterion) -> None:
+        """Sets the criteria that the processors of a group run under.
+
+        They are checked once per update, before the first processor of
+        the group. A group without criteria always runs.
+        """
+        if criteria:
+            self.__group_criteria[group] = criteria
+        else:
+            self.__group_criteria.pop(group, None)
+
+    def observe(
+        self, component_type: type[Component], observer: ComponentObserver
+    ) -> None:
+        """Subscribes an observer to the components of the given type."""
+        self.__observers.setdefault(component_type, []).append(observer)
+
+    def unobserve(
+        self, component_type: type[Component], observer: ComponentObserver
+    ) -> None:
+        """Unsubscribes an observer from the components of the given type."""
+        observers = self.__observers[component_type]
+        observers.remove(observer)
+        if not observers:
+            del self.__observers[component_type]
+
+    def observe_entities(self, observer: EntityObserver) -> None:
+        """Subscribes an observer to the creation and deletion of entities."""
+        self.__entity_observers.append(observer)
+
+    def unobserve_entities(self, observer: EntityObserver) -> None:
+        """Unsubscribes an observer from the creation and deletion of entities."""
+        self.__entity_observers.remove(observer)
+
+    @overload
+    def query(self, c1: type[A], /) -> Query[tuple[A]]: ...
+
+    @overload
+    def query(self, c1: type[A], c2: type[B], /) -> Query[tuple[A, B]]: ...
+
+    @overload
+    def query(
+        self, c1: type[A], c2: type[B], c3: type[C], /
+    ) -> Query[tuple[A, B, C]]: ...
+
+    @overload
+    def query(
+        self, c1: type[A], c2: type[B], c3: type[C], c4: type[D], /
+    ) -> Query[tuple[A, B, C, D]]: ...
+
+    @overload
+    def query(
+        self,
+        c1: type[A],
+        c2: type[B],
+        c3: type[C],
+        c4: type[D],
+        c5: type[E],
+        /,
+    ) -> Query[tuple[A, B, C, D, E]]: ...
+
+    @overload
+    def query(self, *terms: Any) -> Query[tuple[Any, ...]]: ...
+
+    def query(self, *terms: type[Component] | Term) -> Query[Any]:
+        """Returns the cached query of the given components.
+
+        The query is registered on first use and kept up to date afterwards.
+        Terms such as `Changed[T]` restrict it to entities that changed
+        since it last ran.
+        """
+        query = self.__queries.get(terms)
+        if query is None:
+            query = self.__create_query(terms)
+        if self.__profiler is not None:
+            self.__profiler.record_query(
+                ", ".join(getattr(term, "__name__", repr(term)) for term in terms),
+                len(query),
+            )
+        return query
+
+    def __create_query(self, terms: tuple[type[Component] | Term, ...]) -> Query[Any]:
+        tracker = self.__tracker
+        for term in terms:
+            if not isinstance(term, ChangeTerm):
+                continue
+            if tracker.get_log(term.component_type) is None:
+                self.observe(
+                    term.component_type, tracker.create_log(term.component_type)
+                )
+        query = Query(self.__storage, terms, tracker)
+        self.__queries[terms] = query
+        if any(isinstance(term, ChangeTerm) for term in terms):
+            tracker.add_reader(query)
+        for component_type in query.observed_types:
+            self.observe(component_type, query)
+        return query
 
     @overload
     def get_components(self, c1: type[A], /) -> Iterable[tuple[int, tuple[A]]]: ...
@@ -101,21 +347,40 @@ class System:
         /,
     ) -> Iterable[tuple[int, tuple[A, B, C, D]]]: ...
 
+    @overload
+    def get_components(self, *terms: Any) -> Iterable[tuple[int, tuple[Any, ...]]]: ...
+
     def get_components(
-        self, *component_types: type[Component]
+        self, *terms: type[Component] | Term
     ) -> Iterable[tuple[int, tuple[Component, ...]]]:
         """Returns all entities with the given components."""
-        entity_set = set.intersection(
-            *(self.__components[component_type] for component_type in component_types)
-        )
-        for entity in entity_set:
-            yield (
-                entity,
-                tuple(
-                    self.__entitites[entity][component_type]
-                    for component_type in component_types
-                ),
+        return self.query(*terms)
+
+    def iter_chunks(
+        self, *terms: type[Component] | Term, size: int = CHUNK_SIZE
+    ) -> Iterator[tuple[list[int], tuple[Sequence[Any], ...]]]:
+        """Returns the entities of a query in blocks, see `Query.iter_chunks`."""
+        return self.query(*terms).iter_chunks(size)
+
+    def get_columns(
+        self, *component_types: type[ColumnarComponent]
+    ) -> Iterable[tuple[tuple[int, ...], tuple[ColumnView, ...]]]:
+        """Returns column views of all entities with the given columnar components.
+
+        Yields one block per archetype: the entities and a view per component,
+        whose fields are NumPy arrays aligned with the entities.
+        Requires an `ArchetypeStorage`, or a `TableStorage` such as
+        `MappedStorage` whose views read the records directly.
+        """
+        storage = self.__storage
+        if not isinstance(storage, (ArchetypeStorage, TableStorage)):
+            raise TypeError(
+                "Columnar queries require an ArchetypeStorage or a TableStorage"
             )
+        for component_type in component_types:
+            if not issubclass(component_type, ColumnarComponent):
+                raise TypeError(f"{component_type.__name__} is not a ColumnarComponent")
+        return storage.query_columns(component_types)
 
     @overload
     def get_components_of_entity(
@@ -159,18 +424,21 @@ class System:
         self, entity: int, /, *component_types: type[Component]
     ) -> tuple[Any, ...]:
         """Returns the components of the given entity."""
-        entity_dict = self.__entitites[entity]
+        storage = self.__storage
         return (
             *(
-                entity_dict.get(component_type, None)
+                storage.get_component(entity, component_type)
                 for component_type in component_types
             ),
         )
 
     def get_component(self, component_type: type[C], /) -> Iterable[tuple[int, C]]:
         """Returns all entities with the given component."""
-        for entity in self.__components[component_type].copy():
-            yield entity, cast(C, self.__entitites[entity][component_type])
+        if self.__profiler is not None:
+            self.query(component_type)
+        return cast(
+            Iterable[tuple[int, C]], self.__storage.iter_component(component_type)
+        )
 
     @overload
     def get_component_of_entity(
@@ -190,92 +458,466 @@ class System:
         default: Any = None,
     ) -> Any:
         """Returns the component of the given entity."""
-        return self.__entitites[entity].get(component_type, default)
+        return self.__storage.get_component(entity, component_type, default)
 
     def add_component(self, entity: int, component: Component) -> None:
         """Adds a component to an entity."""
-        component_type = type(component)
-        self.__components[component_type].add(entity)
-        self.__entitites[entity][component_type] = component
+        if self.__parallel:
+            self.__structural_change_error()
+        if not self.__entities.is_alive(entity):
+            raise KeyError(f"Entity {entity} does not exist")
+        self.__structural_changes += 1
+        observers = self.__observers.get(type(component))
+        if observers is None:
+            self.__storage.add_component(entity, component)
+            return
+        replaced = self.__storage.has_component(entity, type(component))
+        self.__storage.add_component(entity, component)
+        if replaced:
+            for observer in observers:
+                observer.on_component_changed(entity, component)
+        else:
+            for observer in observers:
+                observer.on_component_added(entity, component)
+
+    def mark_changed(self, entity: int, component_type: type[Component]) -> None:
+        """Reports that a component of an entity was changed in place."""
+        observers = self.__observers.get(component_type)
+        if observers is None:
+            return
+        component = self.__storage.get_component(entity, component_type)
+        if component is None:
+            raise KeyError(f"Entity {entity} has no {component_type.__name__}")
+        for observer in observers:
+            observer.on_component_changed(entity, component)
 
     def has_component(self, entity: int, component_type: type[Component]) -> bool:
         """Returns True if the entity has the given component."""
-        return component_type in self.__entitites[entity]
+        return self.__storage.has_component(entity, component_type)
 
     def has_components(self, entity: int, *component_types: type[Component]) -> bool:
         """Returns True if the entity has all the given components."""
-        components_dict = self.__entitites[entity]
-        return all(comp_type in components_dict for comp_type in component_types)
+        storage = self.__storage
+        return all(
+            storage.has_component(entity, comp_type) for comp_type in component_types
+        )
 
     def remove_component(self, entity: int, component_type: type[C]) -> C | None:
         """Removes a component from an entity."""
-        self.__components[component_type].discard(entity)
-        if not self.__components[component_type]:
-            del self.__components[component_type]
-        return self.__entitites[entity].pop(component_type)  # type: ignore
+        if self.__parallel:
+            self.__structural_change_error()
+        component = self.__storage.remove_component(entity, component_type)
+        self.__structural_changes += 1
+        for observer in self.__observers.get(component_type, ()):
+            observer.on_component_removed(entity, component)
+        return component  # type: ignore
 
     def create_entity(self, *components: Component) -> int:
         """Creates an entity with the given components."""
-        entity = next(self.__entity_counter)
-        if entity not in self.__entitites:
-            self.__entitites[entity] = {}
+        if self.__parallel:
+            self.__structural_change_error()
+        entity = self.__entities.create()
+        self.spawn_entity(entity, *components)
+        return entity
+
+    def create_entities(self, batch: Iterable[Iterable[Component]]) -> list[int]:
+        """Creates an entity for each group of components.
+
+        Returns the ids in the order of the groups.
+        """
+        if self.__parallel:
+            self.__structural_change_error()
+        rows = [tuple(components) for components in batch]
+        entities = self.__entities.create_many(len(rows))
+        groups: dict[tuple[type[Component], ...], list[int]] = {}
+        for index, components in enumerate(rows):
+            signature = tuple(map(type, components))
+            if len(set(signature)) != len(signature):
+                self.spawn_entity(entities[index], *components)
+                continue
+            groups.setdefault(signature, []).append(index)
+        for signature, indices in groups.items():
+            columns = {
+                component_type: [rows[index][i] for index in indices]
+                for i, component_type in enumerate(signature)
+            }
+            self.__spawn_entities([entities[index] for index in indices], columns)
+        return entities
+
+    def create_entities_from_columns(
+        self, columns: Mapping[type[Component], Any], count: int
+    ) -> list[int]:
+        """Creates entities from per-type component columns.
+
+        Each column holds one component per entity. A column of a
+        columnar component may instead map its field names to arrays
+        or single values, which the archetype storage copies into its
+        columns without creating components.
+
+        Raises ValueError, before creating any entity, if a column
+        does not hold `count` values.
+        """
+        if self.__parallel:
+            self.__structural_change_error()
+        check_columns(columns, count)
+        entities = self.__entities.create_many(count)
+        self.__spawn_entities(entities, columns)
+        return entities
+
+    def add_prefab(self, name: str, *components: Component) -> Prefab:
+        """Registers a prefab, validating its components once."""
+        prefab = Prefab(name, *components)
+        self.__prefabs[name] = prefab
+        return prefab
+
+    def get_prefab(self, name: str) -> Prefab | None:
+        """Returns the prefab registered under a name."""
+        return self.__prefabs.get(name)
+
+    def remove_prefab(self, name: str) -> None:
+        """Unregisters a prefab."""
+        del self.__prefabs[name]
+
+    def instantiate(
+        self,
+        prefab: str | Prefab,
+        count: int = 1,
+        overrides: Mapping[type[Component], Any] | None = None,
+    ) -> list[int]:
+        """Creates entities from a prefab, without validating components.
+
+        Overrides replace the column of a type for all the instances,
+        see `Prefab.columns`.
+        """
+        if isinstance(prefab, str):
+            prefab = self.__prefabs[prefab]
+        return self.create_entities_from_columns(
+            prefab.columns(count, overrides), count
+        )
+
+    def reserve_entity(self) -> int:
+        """Reserves an entity id without adding any components.
+
+        Safe to call while processors run in parallel.
+        """
+        with self.__entities_lock:
+            return self.__entities.create()
+
+    def spawn_entity(self, entity: int, *components: Component) -> None:
+        """Adds components to a reserved entity, keeping the first of each type."""
+        if self.__parallel:
+            self.__structural_change_error()
+        if not self.__entities.is_alive(entity):
+            raise KeyError(f"Entity {entity} does not exist")
+        self.__structural_changes += 1
+        storage = self.__storage
+        created = not storage.has_entity(entity)
+        added: dict[type[Component], Component] = {}
         for component in components:
             component_type = type(component)
-            self.__components[component_type].add(entity)
-            if component_type not in self.__entitites[entity]:
-                self.__entitites[entity][component_type] = component
-        return entity
+            if component_type in added:
+                continue
+            if created or not storage.has_component(entity, component_type):
+                added[component_type] = component
+        storage.add_entity(entity, components)
+        if created:
+            for entity_observer in self.__entity_observers:
+                entity_observer.on_entity_created(entity)
+        for component_type, component in added.items():
+            for observer in self.__observers.get(component_type, ()):
+                observer.on_component_added(entity, component)
 
     def delete_entity(self, entity: int, immediate: bool = False) -> None:
         """Deletes an entity."""
-        if immediate:
-            for component_type in self.__entitites[entity]:
-                self.__components[component_type].discard(entity)
-                if not self.__components[component_type]:
-                    del self.__components[component_type]
-            del self.__entitites[entity]
-        else:
+        if not immediate:
             self.__dead_entities.add(entity)
+            return
+        if self.__parallel:
+            self.__structural_change_error()
+        self.__entities.release(entity)
+        self.__structural_changes += 1
+        if not self.__observers and not self.__entity_observers:
+            self.__storage.remove_entity(entity)
+            return
+        components = self.__storage.get_entity(entity)
+        self.__storage.remove_entity(entity)
+        for component_type, component in components.items():
+            for observer in self.__observers.get(component_type, ()):
+                observer.on_component_removed(entity, component)
+        for entity_observer in self.__entity_observers:
+            entity_observer.on_entity_deleted(entity)
+
+    def delete_entities(self, entities: Iterable[int]) -> None:
+        """Deletes entities immediately, skipping the ones already deleted."""
+        if self.__parallel:
+            self.__structural_change_error()
+        storage = self.__storage
+        if not self.__observers and not self.__entity_observers:
+            released = self.__entities.release_many(entities)
+            storage.remove_entities(released)
+            self.__structural_changes += len(released)
+            return
+        is_alive = self.__entities.is_alive
+        release = self.__entities.release
+        for entity in list(entities):
+            # Observers such as the hierarchy may delete later entities first.
+            if not is_alive(entity):
+                continue
+            release(entity)
+            self.__structural_changes += 1
+            components = storage.get_entity(entity)
+            storage.remove_entity(entity)
+            for component_type, component in components.items():
+                for observer in self.__observers.get(component_type, ()):
+                    observer.on_component_removed(entity, component)
+            for entity_observer in self.__entity_observers:
+                entity_observer.on_entity_deleted(entity)
 
     def entity_exists(self, entity: int) -> bool:
         """Returns True if the entity exists."""
-        return entity in self.__entitites and entity not in self.__dead_entities
+        return self.__entities.is_alive(entity) and entity not in self.__dead_entities
+
+    def snapshot(self, file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> None:
+        """Writes the entities and components of the system to a binary file.
+
+        Numeric columns are written as raw buffers and other components
+        as JSON, one block of entities at a time.
+        """
+        snapshot.save(file, self.__entities, self.__storage, chunk_size)
+
+    def restore(self, file: BinaryIO) -> None:
+        """Replaces the entities and components with a snapshot.
+
+        Processors, observers and queries are kept. Queries are matched
+        again, pending commands, change records and hierarchy relations
+        are dropped, and observers are not notified.
+
+        The snapshot is validated before anything changes. If it can not
+        be restored after that, the system is left without entities.
+        A seekable file is read twice so that only one block is held in
+        memory at a time; other files are held whole until restored.
+        """
+        if self.__parallel:
+            self.__structural_change_error()
+        entities, blocks = snapshot.read(file)
+        self.__storage.clear()
+        try:
+            snapshot.fill(self.__storage, entities, blocks)
+        except BaseException:
+            self.__storage.clear()
+            entities = EntityPool()
+            raise
+        finally:
+            self.__entities = entities
+            self.__commands.clear()
+            self.__dead_entities = set()
+            self.__tracker.clear()
+            if self.__hierarchy is not None:
+                self.__hierarchy.clear()
+            for query in self.__queries.values():
+                query.refresh()
+
+    def apply_delta(self, delta: Delta) -> None:
+        """Applies the changes of another system recorded by a `DeltaRecorder`.
+
+        Entities keep their ids, so the system must only change through deltas.
+        Observers and queries are notified as for any other change.
+        """
+        for entity in delta.deleted:
+            if self.entity_exists(entity):
+                self.delete_entity(entity, immediate=True)
+        for entity in delta.created:
+            self.__claim_entity(entity)
+        for component_type, entities in delta.removed.items():
+            for entity in entities:
+                if self.has_component(entity, component_type):
+                    self.remove_component(entity, component_type)
+        for component_type, (entities, column) in delta.changed.items():
+            components = to_components({component_type: column}, len(entities))
+            for entity, component in zip(entities, components[component_type]):
+                self.__claim_entity(entity)
+                self.add_component(entity, component)
+
+    def apply_pending(self) -> None:
+        """Applies the deferred deletions and commands now,
+        rather than at the start of the next update."""
+        self._clear_dead_entities()
+        if self.__commands:
+            self.__commands.apply()
 
-    def start(self) -> None:
-        """Starts the system."""
+    def start(self, scheduler: Scheduler | None = None) -> None:
+        """Starts the system.
+
+        Updates run back to back, or on the schedule of the given scheduler.
+        """
         self.__is_running = True
+        if scheduler is not None:
+            scheduler.run(self)
+            return
         while self.__is_running:
             self.update()
             nolock()
 
     def stop(self) -> None:
-        """Stops the system."""
+        """Stops the system and the threads of its workers."""
         self.__is_running = False
+        self.__shutdown_executor()
 
     def update(self) -> None:
         """Updates the system."""
         self._clear_dead_entities()
-        for processor in self.__processors:
+        self.__tracker.prune()
+        self.__commands.apply()
+        self.__tick += 1
+        if self.plan.conditional:
+            self.__group_runs = {}
+        if self.__profiler is not None:
+            self.__update_profiled(self.__profiler)
+        elif self.__workers is None:
+            self.__update_serial()
+        else:
+            self.__update_staged()
+
+    def __should_run(self, processor: Processor) -> bool:
+        group = processor.group
+        if group is not None:
+            runs = self.__group_runs.get(group)
+            if runs is None:
+                criteria = self.__group_criteria.get(group, ())
+                runs = self.__group_runs[group] = all(c(self) for c in criteria)
+            if not runs:
+                return False
+        return all(criterion(self) for criterion in processor.run_if)
+
+    def __record_run(self, processor: Processor) -> None:
+        if processor.group is not None:
+            record_run(self.__group_criteria.get(processor.group, ()), self)
+        record_run(processor.run_if, self)
+
+    def __update_serial(self) -> None:
+        commands = self.__commands
+        conditional = self.plan.conditional
+        for processor in self.plan.processors:
+            if conditional and not self.__should_run(processor):
+                continue
             processor.process(self)
+            if conditional:
+                self.__record_run(processor)
+            if commands:
+                commands.apply()
+
+    def __update_staged(self) -> None:
+        commands = self.__commands
+        conditional = self.plan.conditional
+        for stage in self.plan.stages:
+            if conditional:
+                stage = tuple(p for p in stage if self.__should_run(p))
+            if len(stage) == 1:
+                stage[0].process(self)
+            elif stage:
+                self.__process_parallel(self.__get_executor(), stage)
+            if conditional:
+                for processor in stage:
+                    self.__record_run(processor)
+            if commands:
+                commands.apply()
+
+    def __update_profiled(self, profiler: Profiler) -> None:
+        commands = self.__commands
+        executor = None if self.__workers is None else self.__get_executor()
+        plan = self.plan
+        stages = (
+            [(processor,) for processor in plan.processors]
+            if executor is None
+            else plan.stages
+        )
+        for stage in stages:
+            if plan.conditional:
+                stage = tuple(p for p in stage if self.__should_run(p))
+                if not stage:
+                    continue
+            if len(stage) == 1 or executor is None:
+                changes = self.__structural_changes
+                stats = profiler.run(stage[0], self)
+                if plan.conditional:
+                    self.__record_run(stage[0])
+                if commands:
+                    commands.apply()
+                profiler.record_changes(stats, self.__structural_changes - changes)
+                continue
+            self.__parallel = True
+            try:
+                futures = [
+                    executor.submit(profiler.run, processor, self)
+                    for processor in stage
+                ]
+                wait(futures)
+            finally:
+                self.__parallel = False
+            for future in futures:
+                future.result()
+            if plan.conditional:
+                for processor in stage:
+                    self.__record_run(processor)
+            if commands:
+                commands.apply()
+        profiler.end_update()
+
+    def __claim_entity(self, entity: int) -> None:
+        if self.entity_exists(entity):
+            return
+        self.__entities.claim(entity)
+        self.spawn_entity(entity)
+
+    def __spawn_entities(
+        self, entities: list[int], columns: Mapping[type[Component], Any]
+    ) -> None:
+        self.__structural_changes += len(entities)
+        storage = self.__storage
+        storage.add_entities(entities, columns)
+        for entity_observer in self.__entity_observers:
+            for entity in entities:
+                entity_observer.on_entity_created(entity)
+        for component_type in columns:
+            observers = self.__observers.get(component_type)
+            if observers is None:
+                continue
+            for entity in entities:
+                component = storage.get_component(entity, component_type)
+                for observer in observers:
+                    observer.on_component_added(entity, component)
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(self.__workers)
+        return self.__executor
+
+    def __shutdown_executor(self) -> None:
+        if self.__executor is not None:
+            # A processor running on a worker can not wait for its own thread.
+            self.__executor.shutdown(wait=not self.__parallel)
+            self.__executor = None
+
+    def __process_parallel(
+        self, executor: ThreadPoolExecutor, stage: tuple[Processor, ...]
+    ) -> None:
+        self.__parallel = True
+        try:
+            futures = [executor.submit(processor.process, self) for processor in stage]
+            wait(futures)
+        finally:
+            self.__parallel = False
+        for future in futures:
+            future.result()
+
+    def __structural_change_error(self) -> None:
+        raise RuntimeError(
+            "Entities and components can not be added or removed"
+            " while processors run in parallel, use System.commands instead"
+        )
 
     def _clear_dead_entities(self) -> None:
         for entity in self.__dead_entities:
-            self.delete_entity(entity, immediate=True)
+            if self.__entities.is_alive(entity):
+                self.delete_entity(entity, immediate=True)
         self.__dead_entities = set()
-
-    def _sort_processors(self) -> None:
-        processors = self.__processors
-        graph: nx.DiGraph[Processor] = nx.DiGraph()
-        for p in processors:
-            graph.add_node(p)
-        for p in processors:
-            for after_cls in p.after:
-                for q in processors:
-                    if isinstance(q, after_cls):
-                        graph.add_edge(q, p)
-            for before_cls in p.before:
-                for q in processors:
-                    if isinstance(q, before_cls):
-                        graph.add_edge(p, q)
-        sorted_processors = list(nx.topological_sort(graph))
-        self.__processors = sorted_processors
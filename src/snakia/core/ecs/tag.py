@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Any, ClassVar, TypeVar
+
+from .component import Component
+
+T = TypeVar("T", bound="Tag")
+
+if TYPE_CHECKING:
+    _Base = Component
+else:
+    _Base = object
+
+
+@cache
+def _instance(cls: type[T]) -> T:
+    return object.__new__(cls)
+
+
+@cache
+def is_tag(component_type: type) -> bool:
+    """Returns True if the component type is a tag."""
+    return issubclass(component_type, Tag)
+
+
+class Tag(_Base):
+    """
+    A component without fields that only marks the entities that have it.
+
+    Every tag type has a single instance, shared by all entities.
+    Storages only record which entities have a tag,
+    and queries return the shared instance for it.
+    """
+
+    __slots__ = ()
+    __sparse__: ClassVar[bool] = False
+
+    def __new__(cls: type[T]) -> T:
+        return _instance(cls)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        annotations = cls.__dict__.get("__annotations__", {})
+        if any("ClassVar" not in str(a) for a in annotations.values()):
+            raise TypeError(f"Tag {cls.__name__} can not have fields")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+    def __copy__(self: T) -> T:
+        return self
+
+    def __deepcopy__(self: T, memo: dict[int, Any]) -> T:
+        return self
+
+    def __reduce__(self) -> tuple[type[Tag], tuple[()]]:
+        return type(self), ()
+
+    @classmethod
+    def model_validate(cls: type[T], _: Any) -> T:
+        """Returns the instance of the tag, ignoring the given data."""
+        return cls()
+
+    def model_dump(self, **_: Any) -> dict[str, Any]:
+        """Returns an empty dict, as tags have no fields."""
+        return {}
+
+    def model_copy(self: T, **_: Any) -> T:
+        """Returns the instance itself, as tags are immutable."""
+        return self
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .component import Component
+
+
+class Term:
+    """
+    A query term that wraps a component type, e.g. `Changed[Position]`.
+    """
+
+    __slots__ = ("component_type",)
+
+    def __init__(self, component_type: type[Component]) -> None:
+        self.component_type: type[Component] = component_type
+
+    def __class_getitem__(cls, component_type: type[Component]) -> Any:
+        return cls(component_type)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            type(other) is type(self)
+            and other.component_type is self.component_type  # type: ignore
+        )
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.component_type))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}[{self.component_type.__name__}]"
+
+
+class ChangeTerm(Term):  # noqa: R0903 # pylint: disable=R0903
+    """A term that matches entities by how their component changed."""
+
+    __slots__ = ()
+
+
+class Added(ChangeTerm):  # noqa: R0903 # pylint: disable=R0903
+    """Matches entities whose component was added since the query last ran."""
+
+    __slots__ = ()
+
+
+class Changed(ChangeTerm):  # noqa: R0903 # pylint: disable=R0903
+    """Matches entities whose component was added or changed since the query last ran.
+
+    In-place changes must be reported with `System.mark_changed`.
+    """
+
+    __slots__ = ()
+
+
+class Removed(ChangeTerm):  # noqa: R0903 # pylint: disable=R0903
+    """Matches entities whose component was removed since the query last ran.
+
+    Yields the removed component. The entity itself may no longer exist.
+    """
+
+    __slots__ = ()
+
+
+class Without(Term):  # noqa: R0903 # pylint: disable=R0903
+    """Matches entities that do not have the component. Yields nothing."""
+
+    __slots__ = ()
+
+
+class Optional(Term):  # noqa: R0903 # pylint: disable=R0903
+    """Yields the component, or None if the entity has none. Does not filter."""
+
+    __slots__ = ()
+
+
+class Or(Term):
+    """Matches entities that have at least one of the components,
+    e.g. `Or[Damage, Heal]`. Yields nothing.
+    """
+
+    __slots__ = ("component_types",)
+
+    def __init__(self, *component_types: type[Component]) -> None:
+        if not component_types:
+            raise ValueError("Or needs at least one component type")
+        super().__init__(component_types[0])
+        self.component_types: tuple[type[Component], ...] = component_types
+
+    def __class_getitem__(cls, component_type: Any) -> Any:
+        if isinstance(component_type, tuple):
+            return cls(*component_type)
+        return cls(component_type)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            type(other) is type(self)
+            and other.component_types == self.component_types  # type: ignore
+        )
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.component_types))
+
+    def __repr__(self) -> str:
+        names = ", ".join(t.__name__ for t in self.component_types)
+        return f"{type(self).__name__}[{names}]"
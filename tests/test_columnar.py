@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from snakia.core.ecs import (
+    ArchetypeStorage,
+    ColumnarComponent,
+    Component,
+    DictStorage,
+    MappedStorage,
+    Storage,
+    System,
+)
+
+
+class Position(ColumnarComponent):
+    x: float = 0.0
+    alive: bool = True
+
+
+class Name(Component):
+    value: str = ""
+
+
+@pytest.fixture(params=["dict", "archetype", "mapped"])
+def storage(request: pytest.FixtureRequest, tmp_path: Path) -> Storage:
+    if request.param == "dict":
+        return DictStorage()
+    if request.param == "archetype":
+        return ArchetypeStorage()
+    return MappedStorage(tmp_path, [Position])
+
+
+def test_field_writes_reach_the_storage(storage: Storage) -> None:
+    system = System(storage)
+    entities = [system.create_entity(Position(x=i), Name()) for i in range(4)]
+    for _, (position,) in system.get_components(Position):
+        position.x += 1
+    for _, (position, _) in system.get_components(Position, Name):
+        position.x += 1
+    for _, position in system.get_component(Position):
+        position.x += 1
+    position = system.get_component_of_entity(entities[0], Position)
+    assert position is not None
+    position.alive = False
+    assert [system.get_component_of_entity(e, Position) for e in entities] == [
+        Position(x=i + 3, alive=i != 0) for i in range(4)
+    ]
+
+
+def test_field_writes_follow_moved_rows(storage: Storage) -> None:
+    system = System(storage)
+    first, second = system.create_entity(Position()), system.create_entity(Position())
+    position = system.get_component_of_entity(second, Position)
+    assert position is not None
+    system.delete_entity(first, immediate=True)
+    system.add_component(second, Name())
+    position.x = 5.0
+    assert system.get_component_of_entity(second, Position) == Position(x=5.0)
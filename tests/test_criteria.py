@@ -0,0 +1,71 @@
+from snakia.core.ecs import (
+    Changed,
+    Component,
+    Processor,
+    System,
+    every,
+    has_entities,
+    resource_changed,
+)
+
+
+class Position(Component):
+    x: int = 0
+
+
+class Config:
+    pass
+
+
+def test_has_entities_with_change_terms() -> None:
+    system = System()
+    entity = system.create_entity(Position())
+    criterion = has_entities(Changed[Position])
+    assert criterion(system) is False
+    system.mark_changed(entity, Position)
+    assert criterion(system) is True
+    assert criterion(system) is True, "checking must not consume the changes"
+    assert [e for e, _ in system.query(Changed[Position])] == [entity]
+    assert criterion(system) is False
+
+
+def test_has_entities_with_components() -> None:
+    system = System()
+    criterion = has_entities(Position)
+    assert criterion(system) is False
+    system.create_entity(Position())
+    assert criterion(system) is True
+
+
+class Reload(Processor):
+    run_if = (resource_changed(Config), every(2))
+
+    def __init__(self) -> None:
+        self.runs: list[int] = []
+
+    def process(self, system: System) -> None:
+        self.runs.append(system.tick)
+
+
+def test_resource_change_is_kept_until_the_processor_runs() -> None:
+    system = System()
+    reload = Reload()
+    system.add_processor(reload)
+    system.update()
+    system.resources.insert(Config())
+    system.update()  # Changed, but every(2) does not pass.
+    system.update()
+    system.update()
+    system.update()
+    assert reload.runs == [3]
+
+
+def test_resource_change_is_tracked_per_system() -> None:
+    first, second = System(), System()
+    first.add_processor(Reload())
+    second.add_processor(Reload())
+    for system in (first, second):
+        system.resources.insert(Config())
+        system.update()
+    assert first.get_processor(Reload).runs == [1]
+    assert second.get_processor(Reload).runs == [1]
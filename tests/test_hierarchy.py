@@ -0,0 +1,46 @@
+from snakia.core.ecs import DictStorage, System
+
+
+def test_propagate_walks_only_the_dirty_subtrees() -> None:
+    system = System(DictStorage())
+    hierarchy = system.hierarchy
+    roots = [system.create_entity() for _ in range(20)]
+    children = {root: [system.create_entity() for _ in range(5)] for root in roots}
+    for root, kids in children.items():
+        for child in kids:
+            hierarchy.set_parent(child, root)
+    grandchild = system.create_entity()
+    hierarchy.set_parent(grandchild, children[roots[3]][1])
+    hierarchy.propagate(lambda entity, parent: None)
+
+    hierarchy.mark_dirty(roots[-1])
+    hierarchy.mark_dirty(children[roots[3]][1])
+    hierarchy.mark_dirty(grandchild)
+    updates: list[tuple[int, int | None]] = []
+    count = hierarchy.propagate(lambda entity, parent: updates.append((entity, parent)))
+
+    assert count == len(updates) == 8
+    assert updates[:2] == [
+        (children[roots[3]][1], roots[3]),
+        (grandchild, children[roots[3]][1]),
+    ]
+    assert updates[2:] == [(roots[-1], None)] + [
+        (child, roots[-1]) for child in children[roots[-1]]
+    ]
+    assert hierarchy.propagate(lambda entity, parent: None) == 0
+
+
+def test_subtrees_follow_their_parents() -> None:
+    system = System(DictStorage())
+    hierarchy = system.hierarchy
+    a, b, c, d, e = (system.create_entity() for _ in range(5))
+    hierarchy.set_parent(b, a)
+    hierarchy.set_parent(c, a)
+    hierarchy.set_parent(d, b)
+    hierarchy.set_parent(e, d)
+    assert list(hierarchy) == [a, b, d, e, c]
+
+    hierarchy.set_parent(b, c)
+    assert list(hierarchy) == [a, c, b, d, e]
+    system.delete_entity(d, immediate=True)
+    assert list(hierarchy) == [a, c, b]
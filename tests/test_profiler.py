@@ -0,0 +1,37 @@
+from snakia.core.ecs import Changed, Component, Processor, System
+
+
+class Position(Component):
+    x: int = 0
+
+
+class Move(Processor):
+    def process(self, system: System) -> None:
+        for entity, (position,) in system.query(Position):
+            if entity % 3 == 0:
+                position.x += 1
+                system.mark_changed(entity, Position)
+
+
+class Watch(Processor):
+    after = (Move,)
+
+    def __init__(self) -> None:
+        self.seen: list[int] = []
+
+    def process(self, system: System) -> None:
+        self.seen.append(sum(1 for _ in system.query(Changed[Position])))
+
+
+def test_change_query_counts_pending_changes() -> None:
+    system = System()
+    system.add_processor(Move())
+    watch = Watch()
+    system.add_processor(watch)
+    system.create_entities([Position()] for _ in range(30))
+    profiler = system.enable_profiling()
+    system.update()
+    system.update()
+    assert watch.seen[-1] == 10
+    assert profiler.get(watch).queries == {"Changed[Position]": 10}
+    assert profiler.get(system.get_processor(Move)).queries == {"Position": 30}
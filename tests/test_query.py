@@ -0,0 +1,60 @@
+import pytest
+
+from snakia.core.ecs import (
+    ArchetypeStorage,
+    Component,
+    DictStorage,
+    Or,
+    System,
+    Without,
+)
+
+
+class Health(Component):
+    value: int = 0
+
+
+class Damage(Component):
+    value: int = 0
+
+
+@pytest.fixture(params=[DictStorage, ArchetypeStorage])
+def system(request: pytest.FixtureRequest) -> System:
+    return System(request.param())
+
+
+def test_components_can_change_while_iterating(system: System) -> None:
+    entities = [system.create_entity(Health(value=i), Damage()) for i in range(50)]
+    visited = []
+    for entity, (health, _) in system.get_components(Health, Damage):
+        visited.append(entity)
+        system.remove_component(entity, Damage)
+        if health.value % 2 == 0:
+            system.create_entity(Health(), Damage())
+        if health.value % 5 == 0:
+            system.delete_entity(entity, immediate=True)
+    assert sorted(visited) == entities
+    assert len(system.query(Health, Damage)) == 25
+
+
+def test_entities_that_stop_matching_are_skipped(system: System) -> None:
+    first, second = system.create_entity(Health()), system.create_entity(Health())
+    visited = []
+    for entity, _ in system.get_components(Health):
+        visited.append(entity)
+        system.remove_component(second if entity == first else first, Health)
+    assert len(visited) == 1
+
+
+class Shield(Component):
+    value: int = 0
+
+
+def test_queries_of_only_or_and_without_terms(system: System) -> None:
+    healthy = system.create_entity(Health())
+    shielded = system.create_entity(Shield(), Damage())
+    system.create_entity(Damage())
+    assert sorted(system.query(Or[Health, Shield])) == sorted(
+        [(healthy, ()), (shielded, ())]
+    )
+    assert list(system.query(Or[Health, Shield], Without[Damage])) == [(healthy, ())]
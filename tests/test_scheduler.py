@@ -0,0 +1,42 @@
+from snakia.core.ecs import Processor, Scheduler, System
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.reads = 0
+
+    def __call__(self) -> float:
+        self.reads += 1
+        assert self.reads < 10_000, "the scheduler stopped making progress"
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        assert seconds > 0
+        self.now += seconds
+
+
+class Work(Processor):
+    def __init__(self, clock: FakeClock, updates: int) -> None:
+        self.clock = clock
+        self.updates = updates
+        self.count = 0
+
+    def process(self, system: System) -> None:
+        self.clock.now += 0.001
+        self.count += 1
+        if self.count == self.updates:
+            system.stop()
+
+
+def test_fixed_step_does_not_stall_short_of_a_deadline() -> None:
+    clock = FakeClock()
+    system = System()
+    work = Work(clock, 100)
+    system.add_processor(work)
+    scheduler = Scheduler(timestep=0.01, clock=clock, sleep=clock.sleep)
+    system.start(scheduler)
+    assert work.count == 100
+    assert scheduler.stats.ticks == 100
+    assert scheduler.stats.dropped == 0
+    assert abs(clock.now - 1.0) < 0.01
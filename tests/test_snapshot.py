@@ -0,0 +1,54 @@
+import io
+
+from snakia.core.ecs import (
+    ArchetypeStorage,
+    ColumnarComponent,
+    Component,
+    DictStorage,
+    System,
+)
+
+
+class Body(ColumnarComponent):
+    mass: float = 1.0
+    alive: bool = True
+
+
+class Name(Component):
+    value: str = ""
+
+
+class Stream(io.RawIOBase):
+    def __init__(self, data: bytes) -> None:
+        self.__data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        data = self.__data.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def snapshot_of(system: System) -> bytes:
+    file = io.BytesIO()
+    system.snapshot(file, chunk_size=3)
+    return file.getvalue()
+
+
+def test_round_trip_from_archetype_to_dict_storage() -> None:
+    source = System(ArchetypeStorage())
+    entities = [
+        source.create_entity(Body(mass=i, alive=i % 2 == 0), Name(value=str(i)))
+        for i in range(10)
+    ]
+    data = snapshot_of(source)
+    for file in (io.BytesIO(data), io.BufferedReader(Stream(data))):
+        target = System(DictStorage())
+        target.restore(file)
+        for i, entity in enumerate(entities):
+            body = target.get_component_of_entity(entity, Body)
+            assert body == Body(mass=i, alive=i % 2 == 0)
+            assert type(body.alive) is bool  # type: ignore[union-attr]
+            assert target.get_component_of_entity(entity, Name) == Name(value=str(i))
@@ -0,0 +1,91 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from snakia.core.ecs import (
+    ArchetypeStorage,
+    ColumnarComponent,
+    Component,
+    DictStorage,
+    MappedStorage,
+    Storage,
+    Tag,
+)
+
+
+class Position(ColumnarComponent):
+    x: float = 0.0
+
+
+class Name(Component):
+    value: str = ""
+
+
+class Effect(Component):
+    __sparse__ = True
+    value: int = 0
+
+
+class Frozen(Tag):
+    pass
+
+
+@pytest.fixture(params=["dict", "archetype", "mapped"])
+def storage(request: pytest.FixtureRequest, tmp_path: Path) -> Storage:
+    if request.param == "dict":
+        return DictStorage()
+    if request.param == "archetype":
+        return ArchetypeStorage()
+    return MappedStorage(tmp_path, [Position])
+
+
+def components(entity: int) -> list[Component]:
+    result: list[Component] = [Position(x=entity)]
+    if entity % 2:
+        result.append(Name(value=str(entity)))
+    if entity % 3 == 0:
+        result.append(Effect(value=entity))
+    if entity % 5 == 0:
+        result.append(Frozen())
+    return result
+
+
+@pytest.mark.parametrize("removed", [3, 60, 200])
+def test_remove_entities(storage: Storage, removed: int) -> None:
+    entities = list(range(1, 201))
+    for entity in entities:
+        storage.add_entity(entity, components(entity))
+    doomed = random.Random(removed).sample(entities, removed)
+    storage.remove_entities(doomed)
+    kept = sorted(set(entities) - set(doomed))
+    assert sorted(storage.entities()) == kept
+    for entity in kept:
+        assert storage.get_entity(entity) == {type(c): c for c in components(entity)}
+    assert sorted(e for e, _ in storage.query((Position,))) == kept
+    assert sorted(e for e, _ in storage.query((Frozen,))) == [
+        e for e in kept if e % 5 == 0
+    ]
+    assert all(not storage.has_entity(entity) for entity in doomed)
+
+
+def test_mapped_entities_are_found_without_loading(tmp_path: Path) -> None:
+    storage = MappedStorage(tmp_path, [Position])
+    storage.add_entities([1, 2, 3], {Position: {"x": [1.0, 2.0, 3.0]}})
+    storage.add_entity(4, [Position(x=4.0), Name(value="named")])
+    storage.flush()
+
+    reopened = MappedStorage(tmp_path, [Position])
+    assert list(reopened.storage.entities()) == []
+    assert sorted(reopened.entities()) == [1, 2, 3, 4]
+    assert reopened.has_entity(2)
+    assert reopened.get_component(3, Position) == Position(x=3.0)
+
+    reopened.remove_component(1, Position)
+    assert reopened.has_entity(1)
+    assert reopened.get_entity(1) == {}
+    reopened.remove_entity(2)
+    assert not reopened.has_entity(2)
+    with pytest.raises(KeyError):
+        reopened.remove_entity(2)
+    assert sorted(reopened.entities()) == [1, 3, 4]